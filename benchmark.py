@@ -0,0 +1,162 @@
+import argparse
+import json
+import os
+import platform
+import time
+import tracemalloc
+
+import numpy as np
+
+import feedback
+import metrics
+import mathler
+import nerdle
+import pattern_cache
+import session
+import word_store
+import wordle
+
+GAMES = {
+    'wordle': (wordle, 'words.csv'),
+    'nerdle': (nerdle, 'nerdle.csv'),
+    'mathler': (mathler, 'mathler.csv'),
+}
+
+
+def run_benchmarks(games=('wordle', 'nerdle', 'mathler'),
+                   sizes=('50', '500', 'full'),
+                   seed=0,
+                   filter_repeats=20,
+                   solve_games=5,
+                   solution=42,
+                   data_dir=pattern_cache.DATA_DIR,
+                   cache_dir=None):
+    results = list()
+    for game in games:
+        module, file_name = GAMES[game]
+        module.WORDS_FILE = os.path.join(data_dir, file_name)
+        module.CACHE_DIR = cache_dir or pattern_cache.CACHE_DIR
+
+        load = get_loader(game, module, solution)
+        words = load()
+        results.append(measure(game, 'load', len(words), len(words), 'words', load))
+        # The other stages work on the words themselves rather than a packed matrix of them
+        if isinstance(words, np.ndarray):
+            words = feedback.decode_words(words)
+
+        rng = np.random.default_rng(seed)
+        for size in sizes:
+            size = len(words) if size == 'full' else min(int(size), len(words))
+            sample = [words[index] for index in np.sort(rng.choice(len(words), size, replace=False))]
+            pairs = [(sample[rng.integers(size)], sample[rng.integers(size)]) for _ in range(filter_repeats)]
+            answers = [sample[rng.integers(size)] for _ in range(solve_games)]
+
+            results.append(measure(game, 'filter', size, size * filter_repeats, 'candidates',
+                                   lambda: run_filters(module, sample, pairs)))
+            results.append(measure(game, 'score', size, size * size, 'patterns',
+                                   lambda: module.get_entropies(sample, keep_probabilities=False)))
+            results.append(measure(game, 'solve', size, None, 'patterns',
+                                   lambda: run_solves(module, sample, answers)))
+
+    return {
+        'seed': seed,
+        'python': platform.python_version(),
+        'numpy': np.__version__,
+        'machine': platform.machine(),
+        'results': results,
+    }
+
+
+def get_loader(game, module, solution):
+    if game == 'mathler':
+        # Build the value index first so the timing is of a normal warm start
+        module.get_value_index()
+        return lambda: module.get_solution_equations(solution)
+    if game == 'nerdle':
+        # The game loads the list packed and memory mapped, so pack it first for the same reason
+        pattern_cache.load_packed_words(module.WORDS_FILE, module.SPEC.length, module.CACHE_DIR)
+        return lambda: pattern_cache.load_packed_words(module.WORDS_FILE, module.SPEC.length, module.CACHE_DIR)
+    return lambda: pattern_cache.read_words(module.WORDS_FILE)
+
+
+def measure(game, stage, size, operations, unit, function):
+    tracemalloc.start()
+    start = time.perf_counter()
+    result = function()
+    seconds = time.perf_counter() - start
+    _, peak_bytes = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+
+    # Some stages only know how much work they did once they have run
+    if operations is None:
+        operations = result
+    print(game, stage, size, round(seconds, 4), 's', peak_bytes, 'bytes')
+    return {
+        'game': game,
+        'stage': stage,
+        'size': size,
+        'seconds': seconds,
+        'peak_bytes': peak_bytes,
+        'operations': operations,
+        'unit': unit,
+        'operations_per_second': operations / seconds if seconds > 0 else None,
+    }
+
+
+def run_filters(module, words, pairs):
+    store = word_store.WordStore(words, module.ALPHABET)
+    for guess, answer in pairs:
+        pattern = feedback.score(guess, answer)
+        yellow_dict = {letter: 0 for letter in module.ALPHABET}
+        module.get_possible_words(store, guess, pattern, yellow_dict)
+
+
+def run_solves(module, words, answers, max_turns=10):
+    # Play each answer by always guessing the remaining word with the most entropy
+    # Returns the number of patterns worked out along the way
+    patterns_evaluated = 0
+    for answer in answers:
+        game = session.Session(words)
+        for _ in range(max_turns):
+            possible_words = game.get_possible_words()
+            patterns_evaluated += len(possible_words) ** 2
+            guess = module.get_entropies(possible_words, keep_probabilities=False).index[0]
+            if guess == answer:
+                break
+            pattern = feedback.score(guess, answer)
+            game.apply(guess, pattern)
+
+    return patterns_evaluated
+
+
+def main():
+    parser = argparse.ArgumentParser(description='Time the solver hot paths and write the results as JSON')
+    parser.add_argument('--games', nargs='+', default=list(GAMES), choices=list(GAMES))
+    parser.add_argument('--sizes', nargs='+', default=['50', '500', 'full'])
+    parser.add_argument('--seed', type=int, default=0)
+    parser.add_argument('--filter-repeats', type=int, default=20)
+    parser.add_argument('--solve-games', type=int, default=5)
+    parser.add_argument('--solution', type=int, default=42)
+    parser.add_argument('--data-dir', default=pattern_cache.DATA_DIR)
+    parser.add_argument('--cache-dir', default=None)
+    parser.add_argument('--output', default='benchmark.json')
+    parser.add_argument('--metrics', default=None, help='Also write per stage metrics to this file as JSON lines')
+    parser.add_argument('--profile-every', type=int, default=0, help='Profile every this many timed calls')
+    args = parser.parse_args()
+
+    metrics_file = open(args.metrics, 'w') if args.metrics else None
+    if metrics_file:
+        metrics.set_sink(metrics.JsonLinesSink(metrics_file), profile_every=args.profile_every)
+    try:
+        report = run_benchmarks(args.games, args.sizes, args.seed, args.filter_repeats, args.solve_games,
+                                args.solution, args.data_dir, args.cache_dir)
+    finally:
+        if metrics_file:
+            metrics.set_sink(None)
+            metrics_file.close()
+    with open(args.output, 'w') as file:
+        json.dump(report, file, indent=2)
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,141 @@
+import itertools
+import re
+from fractions import Fraction
+
+import numpy as np
+
+OPERATORS = '+-*/'
+
+# Roughly how many expressions to evaluate at once
+CHUNK_SIZE = 2 ** 20
+
+
+def create_nerdle_equations(length=8, operators=OPERATORS, integer_division=False):
+    # Every expression=result equation of exactly the given length with a whole, non negative result
+    valid_equations = list()
+    for expression_length in range(3, length - 1):
+        result_length = length - expression_length - 1
+        for expressions, values in generate_expressions(expression_length, operators, integer_division,
+                                                        minimum=10 ** (result_length - 1) if result_length > 1 else 0,
+                                                        maximum=10 ** result_length - 1):
+            valid_equations += [expression + '=' + str(value) for expression, value in zip(expressions, values)]
+    return valid_equations
+
+
+def create_mathler_equations(length=6, operators=OPERATORS, integer_division=False, minimum=0, maximum=998):
+    # Every expression of exactly the given length whose value is a whole number between minimum and maximum
+    valid_equations = list()
+    for expressions, values in generate_expressions(length, operators, integer_division, minimum, maximum):
+        valid_equations += expressions
+    return valid_equations
+
+
+def generate_expressions(length, operators=OPERATORS, integer_division=False, minimum=None, maximum=None):
+    # Yields batches of (expressions, values) for every expression of exactly the given length that evaluates to a
+    # whole number, optionally limited to values between minimum and maximum
+    # Expressions are built from templates of operand lengths and operators, with every operand combination for a
+    # template evaluated at once
+    for operand_lengths in get_operand_lengths(length):
+        sizes = [10 if operand_length == 1 else 9 * 10 ** (operand_length - 1) for operand_length in operand_lengths]
+        starts = [0 if operand_length == 1 else 10 ** (operand_length - 1) for operand_length in operand_lengths]
+        combinations = int(np.prod(sizes))
+
+        for ops in itertools.product(operators, repeat=len(operand_lengths) - 1):
+            for chunk_start in range(0, combinations, CHUNK_SIZE):
+                indices = np.arange(chunk_start, min(chunk_start + CHUNK_SIZE, combinations), dtype=np.int64)
+                operands = [index + start for index, start in zip(np.unravel_index(indices, sizes), starts)]
+
+                numerators, denominators, valid = evaluate_template(operands, ops, integer_division)
+                valid &= numerators % denominators == 0
+                values = numerators // denominators
+                if minimum is not None:
+                    valid &= values >= minimum
+                if maximum is not None:
+                    valid &= values <= maximum
+
+                rows = np.flatnonzero(valid)
+                if len(rows):
+                    yield [format_expression([operand[row] for operand in operands], ops) for row in rows], values[rows]
+
+
+def get_operand_lengths(length):
+    # Every way of splitting the characters not used by operators into at least two operands
+    operand_lengths = list()
+    for operand_count in range(2, (length + 1) // 2 + 1):
+        digits = length - (operand_count - 1)
+        for cuts in itertools.combinations(range(1, digits), operand_count - 1):
+            bounds = (0,) + cuts + (digits,)
+            operand_lengths.append([end - start for start, end in zip(bounds, bounds[1:])])
+    return operand_lengths
+
+
+def evaluate_template(operands, ops, integer_division=False):
+    # Evaluate every combination of operands for one sequence of operators at once, as exact fractions
+    # Multiplication and division are applied to the running term, and each term is added to the total when an
+    # addition or subtraction is reached, which gives the usual operator precedence
+    valid = np.ones(len(operands[0]), dtype=bool)
+    total_numerators = np.zeros(len(operands[0]), dtype=np.int64)
+    total_denominators = np.ones(len(operands[0]), dtype=np.int64)
+    term_numerators = operands[0].copy()
+    term_denominators = np.ones(len(operands[0]), dtype=np.int64)
+    sign = 1
+
+    for op, operand in zip(ops, operands[1:]):
+        if op == '*':
+            term_numerators = term_numerators * operand
+        elif op == '/':
+            # Division by zero is never valid, so use 1 in its place to keep the arithmetic going
+            valid &= operand != 0
+            term_denominators = term_denominators * np.where(operand == 0, 1, operand)
+            if integer_division:
+                valid &= term_numerators % term_denominators == 0
+                term_numerators = term_numerators // term_denominators
+                term_denominators = np.ones(len(operand), dtype=np.int64)
+        else:
+            total_numerators, total_denominators = _add_fractions(total_numerators, total_denominators,
+                                                                  sign * term_numerators, term_denominators)
+            sign = 1 if op == '+' else -1
+            term_numerators = operand
+            term_denominators = np.ones(len(operand), dtype=np.int64)
+
+    total_numerators, total_denominators = _add_fractions(total_numerators, total_denominators,
+                                                          sign * term_numerators, term_denominators)
+    return total_numerators, total_denominators, valid
+
+
+def _add_fractions(first_numerators, first_denominators, second_numerators, second_denominators):
+    numerators = first_numerators * second_denominators + second_numerators * first_denominators
+    denominators = first_denominators * second_denominators
+    divisors = np.gcd(numerators, denominators)
+    return numerators // divisors, denominators // divisors
+
+
+def format_expression(operands, ops):
+    return ''.join(str(operand) + op for operand, op in zip(operands, ops)) + str(operands[-1])
+
+
+def evaluate(expression):
+    # Evaluate a single expression exactly, returning None if it is not a valid expression
+    tokens = re.findall(r'\d+|[-+*/]', expression)
+    if ''.join(tokens) != expression or len(tokens) % 2 == 0:
+        return None
+    if any(token.isdigit() == (index % 2 == 1) for index, token in enumerate(tokens)):
+        return None
+
+    total = Fraction(0)
+    term = Fraction(int(tokens[0]))
+    sign = 1
+    for op, operand in zip(tokens[1::2], tokens[2::2]):
+        operand = int(operand)
+        if op == '*':
+            term *= operand
+        elif op == '/':
+            if operand == 0:
+                return None
+            term /= operand
+        else:
+            total += sign * term
+            sign = 1 if op == '+' else -1
+            term = Fraction(operand)
+
+    return total + sign * term
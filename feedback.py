@@ -0,0 +1,516 @@
+import collections
+import itertools
+import mmap
+import statistics
+from concurrent.futures import ProcessPoolExecutor
+from multiprocessing import shared_memory
+
+import numpy as np
+
+# Pattern keys in the order used by itertools.product(['g', 'y', 'G'], ...)
+# A pattern is stored as a base 3 integer with the first position as the most significant digit
+PATTERN_KEYS = ['g', 'y', 'G']
+
+# Roughly how many guess/answer pairs to compare at once, bounds the size of the temporary arrays
+CHUNK_PAIRS = 2 ** 16
+
+
+def encode_words(words):
+    # Every word in a game has the same length, so the list can be stored as a uint8 matrix of character codes
+    if isinstance(words, np.ndarray):
+        return words
+    words = list(words)
+    if not words:
+        return np.empty((0, 0), dtype=np.uint8)
+    return np.frombuffer(''.join(words).encode('ascii'), dtype=np.uint8).reshape(len(words), -1)
+
+
+def decode_words(matrix):
+    return [row.tobytes().decode('ascii') for row in matrix]
+
+
+def get_word(words, index):
+    word = words[index]
+    return word if isinstance(word, str) else word.tobytes().decode('ascii')
+
+
+def find_word(matrix, word):
+    # The rows of the matrix that hold the word
+    if len(word) != matrix.shape[1]:
+        return np.empty(0, dtype=np.int64)
+    return np.flatnonzero((matrix == np.frombuffer(word.encode('ascii'), dtype=np.uint8)).all(axis=1))
+
+
+def pattern_to_int(pattern):
+    value = 0
+    for key in pattern:
+        value = value * 3 + PATTERN_KEYS.index(key)
+    return value
+
+
+def int_to_pattern(value, length):
+    keys = list()
+    for _ in range(length):
+        value, digit = divmod(value, 3)
+        keys.append(PATTERN_KEYS[digit])
+    return ''.join(reversed(keys))
+
+
+def get_pattern_dtype(length):
+    return np.uint8 if 3 ** length <= 256 else np.uint16
+
+
+def score(guess, answer):
+    # The pattern a guess gets against an answer, by the official rule that every other function here follows
+    # Letters in the right position are green first, then each other letter of the guess, from left to right,
+    # is yellow while the answer still has a copy of it that is not green or already marked yellow
+    pattern = ['G' if letter == answer_letter else 'g' for letter, answer_letter in zip(guess, answer)]
+    unmatched = collections.Counter(answer_letter for key, answer_letter in zip(pattern, answer) if key == 'g')
+    for position, letter in enumerate(guess):
+        if pattern[position] == 'g' and unmatched[letter]:
+            pattern[position] = 'y'
+            unmatched[letter] -= 1
+    return ''.join(pattern)
+
+
+def get_answer_patterns(guess, answers):
+    # The same as score, for one guess against a whole list (or matrix) of answers, as pattern integers
+    return get_patterns([guess], answers)[0]
+
+
+def get_matching_rows(matrix, guess, pattern, rows=None, chunk_rows=2 ** 16):
+    # The rows of the (possibly memory mapped) matrix that would give the pattern for the guess,
+    # worked out a chunk at a time so the whole matrix never has to be in memory at once
+    rows = np.arange(len(matrix)) if rows is None else rows
+    value = pattern_to_int(pattern)
+    matches = [rows[:0]]
+    for start in range(0, len(rows), chunk_rows):
+        chunk = rows[start:start + chunk_rows]
+        matches.append(chunk[get_answer_patterns(guess, matrix[chunk]) == value])
+    return np.concatenate(matches)
+
+
+def get_patterns(guesses, answers):
+    # Get the pattern every guess would produce against every answer, as a (guesses x answers) matrix
+    # This is score worked out for whole blocks of guesses and answers at once
+    guesses = encode_words(guesses)
+    answers = encode_words(answers)
+
+    length = answers.shape[1]
+    patterns = np.zeros((len(guesses), len(answers)), dtype=get_pattern_dtype(length))
+    chunk_size = max(1, CHUNK_PAIRS // max(len(answers), 1))
+    for start in range(0, len(guesses), chunk_size):
+        block = guesses[start:start + chunk_size]
+        patterns[start:start + len(block)] = _get_block_patterns(block, answers)
+
+    return patterns
+
+
+def _get_block_patterns(guesses, answers):
+    length = guesses.shape[1]
+    green = [guesses[:, position, None] == answers[None, :, position] for position in range(length)]
+    not_green = [~match for match in green]
+    patterns = np.zeros(green[0].shape, dtype=np.uint16)
+
+    for position in range(length):
+        letter = guesses[:, position, None]
+
+        # Copies of the letter in the answer that are not already used up by a green
+        supply = np.zeros(green[0].shape, dtype=np.int8)
+        for other in range(length):
+            supply += (letter == answers[None, :, other]) & not_green[other]
+
+        # Earlier copies of the letter in the guess that are not green get marked yellow first
+        claimed = np.zeros(green[0].shape, dtype=np.int8)
+        for other in range(position):
+            claimed += (letter == guesses[:, other, None]) & not_green[other]
+
+        patterns *= 3
+        patterns += green[position] * np.uint16(2)
+        patterns += not_green[position] & (claimed < supply)
+
+    return patterns
+
+
+def get_pattern_counts(patterns, length, weights=None):
+    # Count how many answers produce each pattern, for every guess (row) at once
+    # With a weight for each answer (column) the weights of the answers are added up instead
+    size = 3 ** length
+    offsets = np.arange(len(patterns), dtype=np.int64)[:, None] * size
+    if weights is not None:
+        weights = np.broadcast_to(np.asarray(weights, dtype=np.float64), patterns.shape).ravel()
+    counts = np.bincount((patterns + offsets).ravel(), weights=weights, minlength=len(patterns) * size)
+    return counts.reshape(len(patterns), size)
+
+
+def get_entropies_from_counts(counts):
+    totals = counts.sum(axis=1, keepdims=True)
+    probabilities = np.divide(counts, totals, out=np.zeros(counts.shape), where=totals > 0)
+    information = np.negative(np.log2(probabilities, out=np.zeros(counts.shape), where=probabilities > 0))
+    return (probabilities * information).sum(axis=1)
+
+
+def get_sparse_entropies(patterns, weights=None):
+    # Work out the entropy of each guess (row) from only the patterns that actually occur,
+    # by sorting each row so that equal patterns sit together and measuring the length of each run
+    # The work depends on the number of answers rather than on the number of possible patterns
+    guess_count, answer_count = patterns.shape
+    if not answer_count:
+        return np.zeros(guess_count)
+    # Sorting is much faster on 16 bit values than on 8 bit ones
+    ordered = np.sort(patterns.astype(np.uint16, copy=False), axis=1)
+    run_starts = np.ones(ordered.shape, dtype=bool)
+    np.not_equal(ordered[:, 1:], ordered[:, :-1], out=run_starts[:, 1:])
+
+    starts = np.flatnonzero(run_starts)
+    rows = starts // answer_count
+    if weights is None:
+        probabilities = np.diff(np.append(starts, ordered.size)) / answer_count
+    else:
+        # With a weight for each answer (column) the probability of a pattern is its share of the total weight,
+        # added up with a weighted bincount and read back at only the patterns that occur
+        weights = np.asarray(weights, dtype=np.float64)
+        if not weights.sum():
+            return np.zeros(guess_count)
+        size = int(ordered[:, -1].max()) + 1
+        offsets = np.arange(guess_count, dtype=np.int64)[:, None] * size
+        sums = np.bincount((patterns + offsets).ravel(), weights=np.broadcast_to(weights, patterns.shape).ravel(),
+                           minlength=guess_count * size)
+        probabilities = sums[rows * size + ordered.ravel()[starts]] / weights.sum()
+    information = probabilities * np.negative(np.log2(probabilities, out=np.zeros(len(probabilities)),
+                                                      where=probabilities > 0))
+    return np.bincount(rows, weights=information, minlength=guess_count)
+
+
+def get_board_entropies(patterns, rows, boards, length):
+    # The entropy of each guess row on each of several boards, where each board's candidates are columns of patterns
+    # Every board is scored in the same pass over the guesses, by numbering each board's patterns after the patterns
+    # of the boards before it and tallying the patterns that occur, as in get_sparse_entropies
+    columns = np.concatenate([np.empty(0, dtype=np.int64)] + [np.asarray(board) for board in boards])
+    sizes = np.array([len(board) for board in boards])
+    key_dtype = np.uint16 if len(boards) * 3 ** length <= 2 ** 16 else np.int64
+    board_keys = np.repeat(np.arange(len(boards)) * 3 ** length, sizes).astype(key_dtype)
+    entropies = np.zeros((len(rows), len(boards)))
+    if not len(columns):
+        return entropies
+
+    chunk_size = max(1, CHUNK_PAIRS // len(columns))
+    for start in range(0, len(rows), chunk_size):
+        block = np.asarray(patterns[np.ix_(rows[start:start + chunk_size], columns)])
+        ordered = np.sort(block.astype(key_dtype) + board_keys, axis=1)
+        run_starts = np.ones(ordered.shape, dtype=bool)
+        np.not_equal(ordered[:, 1:], ordered[:, :-1], out=run_starts[:, 1:])
+
+        starts = np.flatnonzero(run_starts)
+        run_boards = ordered.ravel()[starts] // 3 ** length
+        probabilities = np.diff(np.append(starts, ordered.size)) / sizes[run_boards]
+        information = probabilities * np.negative(np.log2(probabilities))
+        run_keys = starts // len(columns) * len(boards) + run_boards
+        entropies[start:start + len(block)] = np.bincount(run_keys, weights=information,
+                                                          minlength=len(block) * len(boards)).reshape(len(block), -1)
+
+    return entropies
+
+
+def get_guess_entropies(guesses, answers, length, patterns=None, weights=None, rows=None, columns=None):
+    # Work out the entropy of each guess a chunk at a time, so neither the full pattern matrix
+    # nor the full table of pattern counts has to be held in memory
+    # The answers are equally likely unless they are given weights, such as how common each word is
+    # With rows or columns the patterns are a whole (possibly memory mapped) matrix, of which only those guesses and
+    # answers are scored, copied out a chunk at a time
+    guesses = encode_words(guesses) if patterns is None else None
+    answers = encode_words(answers)
+    guess_count = get_row_count(patterns, rows) if patterns is not None else len(guesses)
+    entropies = np.zeros(guess_count)
+
+    # With fewer answers than possible patterns most patterns cannot occur, so only the ones that do are counted
+    sparse = len(answers) < 3 ** length
+    chunk_size = max(1, CHUNK_PAIRS // max(len(answers), 1 if sparse else 3 ** length))
+    for start in range(0, guess_count, chunk_size):
+        if patterns is not None:
+            block = get_pattern_block(patterns, start, start + chunk_size, rows, columns)
+        else:
+            block = get_patterns(guesses[start:start + chunk_size], answers)
+        if sparse:
+            entropies[start:start + len(block)] = get_sparse_entropies(np.asarray(block), weights=weights)
+        else:
+            entropies[start:start + len(block)] = get_entropies_from_counts(get_pattern_counts(block, length,
+                                                                                               weights=weights))
+
+    return entropies
+
+
+def get_row_count(patterns, rows=None):
+    return len(patterns) if rows is None else len(rows)
+
+
+def get_pattern_block(patterns, start, stop, rows=None, columns=None):
+    # The patterns of the guesses from start to stop, out of the given rows and columns of the matrix if there are any
+    chunk = slice(start, stop) if rows is None else rows[start:stop]
+    if columns is None:
+        return patterns[chunk]
+    return patterns[chunk][:, columns] if rows is None else patterns[np.ix_(chunk, columns)]
+
+
+def get_sampled_entropies(guesses, answers, length, patterns=None, confidence=0.95, resamples=8, seed=0):
+    # Estimate the entropy of each guess from its patterns against a random sample of the answers, along with the
+    # half width of an approximate confidence interval around each estimate
+    # A small sample misses many of the rarer patterns and so underestimates the entropy, which the Chao-Shen
+    # estimator makes up for by guessing from the patterns seen only once how much of the answers the sample covers
+    # That still leaves a bias which shrinks as the sample grows, so the estimate is also made from random halves of
+    # the sample: their spread stands in for the spread of the estimate, and twice how far they move from it is
+    # added on as a margin for the bias
+    guesses = encode_words(guesses) if patterns is None else None
+    answers = encode_words(answers)
+    guess_count = len(patterns) if patterns is not None else len(guesses)
+    sample_count = len(answers)
+    estimates = np.zeros(guess_count)
+    half_widths = np.zeros(guess_count)
+    if not sample_count:
+        return estimates, half_widths
+
+    z = statistics.NormalDist().inv_cdf((1 + confidence) / 2)
+    rng = np.random.default_rng(seed)
+    half_count = max(1, sample_count // 2)
+    halves = np.array([rng.permutation(sample_count)[:half_count] for _ in range(resamples)], dtype=np.intp)
+    halves = halves.reshape(resamples, half_count)
+    chunk_size = max(1, CHUNK_PAIRS // sample_count)
+    for start in range(0, guess_count, chunk_size):
+        if patterns is not None:
+            block = np.asarray(patterns[start:start + chunk_size])
+        else:
+            block = get_patterns(guesses[start:start + chunk_size], answers)
+        block = block.astype(np.uint16, copy=False)
+        order = np.argsort(block, axis=1, kind='stable')
+        ordered = np.take_along_axis(block, order, axis=1)
+        run_starts = np.ones(ordered.shape, dtype=bool)
+        np.not_equal(ordered[:, 1:], ordered[:, :-1], out=run_starts[:, 1:])
+
+        starts = np.flatnonzero(run_starts)
+        rows = starts // sample_count
+        row_starts = np.append(0, np.cumsum(run_starts.sum(axis=1))[:-1])
+        counts = np.diff(np.append(starts, ordered.size))
+        estimate = _get_chao_shen(rows, row_starts, counts, sample_count, len(block))
+
+        # Each answer in the sample is numbered by the run of equal patterns it falls in for each guess, so the
+        # halves only need their runs counted again, all of them at once with each half's runs numbered apart
+        # The numbers are kept with one row per answer, so taking the rows for a half copies whole rows
+        runs = np.empty(ordered.shape, dtype=np.int32)
+        np.put_along_axis(runs, order, (np.cumsum(run_starts) - 1).astype(np.int32).reshape(ordered.shape), axis=1)
+        runs = np.ascontiguousarray(runs.T)
+        offsets = np.arange(resamples)[:, None]
+        half_runs = runs[halves] + (offsets * len(starts))[:, :, None].astype(np.int32)
+        half_counts = np.bincount(half_runs.ravel(), minlength=resamples * len(starts))
+        half_estimates = _get_chao_shen((rows + offsets * len(block)).ravel(),
+                                        (row_starts + offsets * len(starts)).ravel(), half_counts, half_count,
+                                        resamples * len(block)).reshape(resamples, len(block))
+
+        spread = half_estimates.std(axis=0, ddof=1) if resamples > 1 else np.zeros(len(block))
+        estimates[start:start + len(block)] = estimate
+        half_widths[start:start + len(block)] = z * spread + 2 * np.abs(half_estimates.mean(axis=0) - estimate)
+
+    return estimates, half_widths
+
+
+def _get_chao_shen(rows, row_starts, counts, sample_count, guess_count):
+    # The counts of each guess's patterns are in a run of their own starting at its row start, rows gives the guess
+    # for each count
+    # Each pattern's share is scaled down by the estimated coverage, and weighted up by how unlikely the sample was
+    # to see it at all
+    # Most patterns in a small sample are seen once and so all add the same amount for their guess, only the rest
+    # are worked out one by one, and patterns with no count are skipped
+    singles = np.add.reduceat(counts == 1, row_starts, dtype=np.intp)
+    coverages = 1 - np.minimum(singles, sample_count - 1) / sample_count
+    estimates = singles * _get_adjusted_information(coverages / sample_count, sample_count)
+    repeated = np.flatnonzero(counts > 1)
+    shares = coverages[rows[repeated]] * (counts[repeated] / sample_count)
+    return estimates + np.bincount(rows[repeated], weights=_get_adjusted_information(shares, sample_count),
+                                   minlength=guess_count)
+
+
+def _get_adjusted_information(shares, sample_count):
+    return shares * np.negative(np.log2(shares)) / (1 - (1 - shares) ** sample_count)
+
+
+def get_entropy_bounds(guesses, answers, weights=None):
+    # An upper bound on the entropy of each guess against the answers, worked out from the letters alone
+    # The entropy of a pattern is at most the sum of the entropies of its parts, so each letter that appears once in
+    # the guess adds the entropy of its own color, and each letter that appears more than once adds the entropy of
+    # whether each copy is green and of how many copies the answer has (up to as many as the guess has)
+    # Everything comes from a few small tables of letter frequencies, so bounding every guess is cheap
+    guesses = encode_words(guesses)
+    answers = encode_words(answers)
+    answer_count, length = answers.shape
+    if not answer_count:
+        return np.zeros(len(guesses))
+    if weights is None:
+        probabilities = np.full(answer_count, 1 / answer_count)
+    else:
+        probabilities = np.asarray(weights, dtype=np.float64) / np.sum(weights, dtype=np.float64)
+
+    # How likely each character is at each position, and how likely the answer is to have each number of it
+    green = np.array([np.bincount(answers[:, position], weights=probabilities, minlength=256)
+                      for position in range(length)])
+    copies = np.zeros((256, length + 1))
+    copies[:, 0] = 1
+    for code in np.unique(answers):
+        copies[code] = np.bincount((answers == code).sum(axis=1), weights=probabilities, minlength=length + 1)
+
+    color_entropies = _get_information(green) + _get_information(1 - copies[:, 0] - green)
+    color_entropies += _get_information(copies[:, 0])
+    green_entropies = _get_information(green) + _get_information(1 - green)
+    copy_entropies = np.zeros((256, length + 1))
+    for most in range(1, length + 1):
+        copy_entropies[:, most] = _get_information(copies[:, :most]).sum(axis=1)
+        copy_entropies[:, most] += _get_information(copies[:, most:].sum(axis=1))
+
+    # How many times the letter in each position appears in the guess, and whether this is its first appearance
+    repeats = np.zeros(guesses.shape, dtype=np.int64)
+    first = np.ones(guesses.shape, dtype=bool)
+    for position in range(length):
+        for other in range(length):
+            repeats[:, position] += guesses[:, position] == guesses[:, other]
+            if other < position:
+                first[:, position] &= guesses[:, position] != guesses[:, other]
+
+    positions = np.arange(length)
+    bounds = np.where(repeats == 1, color_entropies[positions, guesses],
+                      green_entropies[positions, guesses] + np.where(first, copy_entropies[guesses, repeats], 0))
+    return np.minimum(bounds.sum(axis=1), np.log2(np.count_nonzero(probabilities)))
+
+
+def _get_information(probabilities):
+    return np.negative(probabilities * np.log2(probabilities, out=np.zeros(probabilities.shape),
+                                               where=probabilities > 0))
+
+
+def get_top_entropies(bounds, top_k, get_entropies, chunk_size=256):
+    # The top_k guesses by entropy, as their indexes and entropies best first, the earlier guess first on ties
+    # Guesses are scored with get_entropies(indexes) a chunk at a time in order of an upper bound on their entropy,
+    # such as from get_entropy_bounds, stopping as soon as no bound left can beat the top_k found so far
+    best_indexes = np.empty(0, dtype=np.int64)
+    best_entropies = np.empty(0)
+    order = np.argsort(-bounds, kind='stable')
+    chunk_size = max(top_k, chunk_size)
+    for start in range(0, len(order), chunk_size):
+        indexes = order[start:start + chunk_size]
+
+        # The bounds are only as exact as floating point, so a guess is only skipped when it is clearly below
+        if len(best_indexes) == top_k:
+            indexes = indexes[bounds[indexes] >= best_entropies[-1] - 1e-9]
+            if not len(indexes):
+                break
+        best_indexes = np.append(best_indexes, indexes)
+        best_entropies = np.append(best_entropies, get_entropies(indexes))
+        best = np.lexsort((best_indexes, -best_entropies))[:top_k]
+        best_indexes, best_entropies = best_indexes[best], best_entropies[best]
+
+    return best_indexes, best_entropies
+
+
+def get_pattern_counts_parallel(guesses, answers, length, workers, patterns=None, weights=None, rows=None,
+                                columns=None):
+    counts = _score_parallel(guesses, answers, length, workers, patterns, weights, 'counts', rows, columns)
+    return counts if weights is not None else counts.astype(np.int64)
+
+
+def get_guess_entropies_parallel(guesses, answers, length, workers, patterns=None, weights=None, rows=None,
+                                 columns=None):
+    return _score_parallel(guesses, answers, length, workers, patterns, weights, 'entropies', rows, columns)
+
+
+def _score_parallel(guesses, answers, length, workers, patterns, weights, output, rows=None, columns=None):
+    # Split the guesses into chunks across a pool of processes
+    # The word matrices (or the precomputed patterns) and the output are held in shared memory, so nothing
+    # large has to be pickled to or from the workers
+    # A pattern matrix memory mapped from a whole cached file is mapped again by each worker instead, and only the
+    # rows and columns to score are shared, so no copy of the matrix is made
+    path = None
+    if patterns is not None:
+        inputs = {'answers': encode_words(answers)}
+        if isinstance(patterns, np.memmap) and isinstance(patterns.base, mmap.mmap):
+            path = patterns.filename
+        else:
+            patterns = get_pattern_block(patterns, 0, get_row_count(patterns, rows), rows, columns)
+            rows, columns = None, None
+            inputs['patterns'] = np.ascontiguousarray(patterns)
+        if rows is not None:
+            inputs['rows'] = np.asarray(rows, dtype=np.int64)
+        if columns is not None:
+            inputs['columns'] = np.asarray(columns, dtype=np.int64)
+        guess_count = get_row_count(patterns, rows)
+    else:
+        inputs = {'guesses': encode_words(guesses), 'answers': encode_words(answers)}
+        guess_count = len(inputs['guesses'])
+
+    if weights is not None:
+        inputs['weights'] = np.asarray(weights, dtype=np.float64)
+    if output == 'counts':
+        inputs['counts'] = np.zeros((guess_count, 3 ** length), dtype=np.int32 if weights is None else np.float64)
+    else:
+        inputs['entropies'] = np.zeros(guess_count)
+
+    blocks = list()
+    try:
+        specs = dict()
+        for name, array in inputs.items():
+            specs[name] = _share_array(array, blocks)
+
+        chunk_size = max(1, -(-guess_count // (workers * 4)))
+        chunks = [(start, min(start + chunk_size, guess_count)) for start in range(0, guess_count, chunk_size)]
+        with ProcessPoolExecutor(max_workers=workers, initializer=_attach_shared_arrays,
+                                 initargs=(specs, path)) as pool:
+            list(pool.map(_score_chunk, chunks, itertools.repeat(length)))
+
+        return _attach_array(blocks[-1], specs[output]).copy()
+    finally:
+        for block in blocks:
+            block.close()
+            block.unlink()
+
+
+def _share_array(array, blocks):
+    block = shared_memory.SharedMemory(create=True, size=max(array.nbytes, 1))
+    blocks.append(block)
+    _attach_array(block, (block.name, array.shape, array.dtype.str))[...] = array
+    return block.name, array.shape, array.dtype.str
+
+
+def _attach_array(block, spec):
+    _, shape, dtype = spec
+    return np.ndarray(shape, dtype=dtype, buffer=block.buf)
+
+
+# Arrays each worker process has attached to, set up once per process by _attach_shared_arrays
+_worker_blocks = list()
+_worker_arrays = dict()
+
+
+def _attach_shared_arrays(specs, path=None):
+    for name, spec in specs.items():
+        block = shared_memory.SharedMemory(name=spec[0])
+        _worker_blocks.append(block)
+        _worker_arrays[name] = _attach_array(block, spec)
+    if path is not None:
+        _worker_arrays['patterns'] = np.load(path, mmap_mode='r')
+
+
+def _score_chunk(chunk, length):
+    start, end = chunk
+    answers, weights = _worker_arrays['answers'], _worker_arrays.get('weights')
+    if 'patterns' in _worker_arrays:
+        # Only the chunk's rows are passed on, to be copied out of the matrix a few at a time as they are scored
+        guesses, patterns, columns = None, _worker_arrays['patterns'], _worker_arrays.get('columns')
+        rows = _worker_arrays['rows'][start:end] if 'rows' in _worker_arrays else np.arange(start, end)
+    else:
+        guesses, patterns, rows, columns = _worker_arrays['guesses'][start:end], None, None, None
+
+    if 'entropies' in _worker_arrays:
+        _worker_arrays['entropies'][start:end] = get_guess_entropies(guesses, answers, length, patterns=patterns,
+                                                                     weights=weights, rows=rows, columns=columns)
+    else:
+        if patterns is None:
+            patterns = get_patterns(guesses, answers)
+        else:
+            patterns = get_pattern_block(patterns, 0, len(rows), rows, columns)
+        _worker_arrays['counts'][start:end] = get_pattern_counts(patterns, length, weights=weights)
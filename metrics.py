@@ -0,0 +1,159 @@
+import cProfile
+import json
+import pstats
+import time
+
+# Where measurements are sent, nothing is measured (and almost nothing is spent on measuring) until one is set
+_sink = None
+
+# Every this many timed calls is also run under cProfile, or never if 0
+_profile_every = 0
+_timed_calls = 0
+_profiling = False
+
+
+def set_sink(sink, profile_every=0):
+    # Send measurements to the sink from now on, or stop measuring with None
+    # A sink needs increment, observe, timing and profile methods, like MemorySink and JsonLinesSink below
+    global _sink, _profile_every, _timed_calls
+    _sink = sink
+    _profile_every = profile_every
+    _timed_calls = 0
+
+
+def get_sink():
+    return _sink
+
+
+def increment(name, value=1):
+    if _sink is not None:
+        _sink.increment(name, int(value))
+
+
+def observe(name, value):
+    if _sink is not None:
+        _sink.observe(name, value)
+
+
+class Stopwatch:
+    # Times a call as a whole and each stage of it, along with how many candidates were left after each stage
+    # Laps are timed from the end of the last one, and stop records the time for the whole call
+    def __init__(self, name):
+        self.name = name
+        self.sink = _sink
+        self.profiler = None
+        if self.sink is None:
+            return
+        self.start = self.last = time.perf_counter()
+        self.profiler = _start_profiler()
+
+    def lap(self, stage, **values):
+        if self.sink is None:
+            return
+        now = time.perf_counter()
+        self.sink.timing(self.name + '.' + stage, now - self.last)
+        self.last = now
+        for key, value in values.items():
+            self.sink.observe(self.name + '.' + stage + '.' + key, value)
+
+    def stop(self, **values):
+        if self.sink is None:
+            return
+        self.sink.timing(self.name, time.perf_counter() - self.start)
+        for key, value in values.items():
+            self.sink.observe(self.name + '.' + key, value)
+        if self.profiler is not None:
+            _stop_profiler(self.profiler)
+            self.sink.profile(self.name, pstats.Stats(self.profiler))
+            self.profiler = None
+
+
+def _start_profiler():
+    # Only one profiler can run at a time, so calls made from inside a profiled call are never profiled themselves
+    global _timed_calls, _profiling
+    _timed_calls += 1
+    if not _profile_every or _profiling or _timed_calls % _profile_every:
+        return None
+    _profiling = True
+    profiler = cProfile.Profile()
+    profiler.enable()
+    return profiler
+
+
+def _stop_profiler(profiler):
+    global _profiling
+    profiler.disable()
+    _profiling = False
+
+
+class MemorySink:
+    # Keeps running totals of everything in memory, to be looked at with summary() and print_profile()
+    def __init__(self):
+        self.counters = dict()
+        self.observations = dict()
+        self.timings = dict()
+        self.profiles = dict()
+
+    def increment(self, name, value):
+        self.counters[name] = self.counters.get(name, 0) + value
+
+    def observe(self, name, value):
+        _add_observation(self.observations, name, value)
+
+    def timing(self, name, seconds):
+        _add_observation(self.timings, name, seconds)
+
+    def profile(self, name, stats):
+        if name in self.profiles:
+            self.profiles[name].add(stats)
+        else:
+            self.profiles[name] = stats
+
+    def summary(self):
+        return {
+            'counters': dict(sorted(self.counters.items())),
+            'observations': dict(sorted(self.observations.items())),
+            'timings': dict(sorted(self.timings.items())),
+        }
+
+    def print_profile(self, name, limit=20):
+        self.profiles[name].sort_stats('cumulative').print_stats(limit)
+
+
+def _add_observation(observations, name, value):
+    if name not in observations:
+        observations[name] = {'count': 0, 'total': 0, 'min': value, 'max': value}
+    observation = observations[name]
+    observation['count'] += 1
+    observation['total'] += value
+    observation['min'] = min(observation['min'], value)
+    observation['max'] = max(observation['max'], value)
+
+
+class JsonLinesSink:
+    # Writes every measurement to an open file as one line of JSON, for other tools to collect
+    # Profiles are written as the functions that took the most cumulative time
+    def __init__(self, file, profile_limit=20):
+        self.file = file
+        self.profile_limit = profile_limit
+
+    def increment(self, name, value):
+        self.write('counter', name, value)
+
+    def observe(self, name, value):
+        self.write('observation', name, value)
+
+    def timing(self, name, seconds):
+        self.write('timing', name, seconds)
+
+    def profile(self, name, stats):
+        functions = sorted(stats.stats.items(), key=lambda item: item[1][3], reverse=True)[:self.profile_limit]
+        self.write('profile', name, [{'function': pstats.func_std_string(function),
+                                      'calls': calls,
+                                      'total_seconds': total_time,
+                                      'cumulative_seconds': cumulative_time}
+                                     for function, (_, calls, total_time, cumulative_time, _) in functions])
+
+    def write(self, kind, name, value):
+        self.file.write(json.dumps({'time': time.time(), 'type': kind, 'name': name, 'value': value},
+                                   default=float) + '\n')
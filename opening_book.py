@@ -0,0 +1,101 @@
+import collections
+import os
+import pickle
+
+import feedback
+import metrics
+import pattern_cache
+import session
+
+
+class OpeningBook:
+    # Ranked guesses for each position in a game, keyed by the (guess, pattern) pairs played so far
+    # The opening and every reply to a first guess are kept and saved to disk, since most queries are for those,
+    # while deeper positions are only kept in memory for the most recently used ones
+    def __init__(self, answers, patterns, guesses, path, size=100, open_guesses=False, cache_size=4096):
+        self.answers = answers
+        self.patterns = patterns
+        self.guesses = guesses
+        self.path = path
+        self.size = size
+        self.open_guesses = open_guesses
+        self.cache_size = cache_size
+        self.length = len(feedback.get_word(answers, 0))
+        self.game = session.Session(answers, patterns=patterns, guesses=guesses)
+
+        self.entries = dict()
+        if os.path.exists(path):
+            with open(path, 'rb') as file:
+                self.entries = pickle.load(file)
+        self.unsaved = False
+        self.deeper_entries = collections.OrderedDict()
+
+    def get_ranked_guesses(self, history):
+        key = tuple((guess, pattern) for guess, pattern in history)
+        if len(key) <= 1:
+            if key not in self.entries:
+                metrics.increment('opening_book.misses')
+                self.entries[key] = self.rank_guesses(key)
+                self.unsaved = True
+            else:
+                metrics.increment('opening_book.hits')
+            return self.entries[key]
+
+        if key in self.deeper_entries:
+            metrics.increment('opening_book.hits')
+            self.deeper_entries.move_to_end(key)
+        else:
+            metrics.increment('opening_book.misses')
+            self.deeper_entries[key] = self.rank_guesses(key)
+            if len(self.deeper_entries) > self.cache_size:
+                self.deeper_entries.popitem(last=False)
+        return self.deeper_entries[key]
+
+    def rank_guesses(self, key):
+        # Positions are usually looked up one after another, so the session only moves by the guesses that differ
+        self.game.set_guesses(key)
+        possible = self.game.candidates
+        if not len(possible):
+            return list()
+
+        rows = pattern_cache.get_guess_rows(len(self.guesses), self.game.answer_rows[possible], self.open_guesses)
+
+        # Keep the best guesses, possible answers first on ties since they might also end the game
+        order, entropies = self.game.get_top_entropies(rows, self.size)
+        return [(feedback.get_word(self.guesses, rows[index]), float(entropy))
+                for index, entropy in zip(order, entropies)]
+
+    def build(self, first_guess):
+        # Fill in the reply to every pattern the first guess can give
+        guess_patterns = self.patterns[self.game.get_guess_row(first_guess)]
+        for pattern in sorted(set(guess_patterns.tolist())):
+            self.get_ranked_guesses([(first_guess, feedback.int_to_pattern(pattern, self.length))])
+        self.save()
+
+    def save(self):
+        if not self.unsaved:
+            return
+
+        # Other processes may have saved positions of their own to the same book since it was loaded, so those are
+        # kept along with the ones ranked here (two saves at the same moment can still drop the other's new positions,
+        # which only means they are ranked again and saved the next time)
+        if os.path.exists(self.path):
+            with open(self.path, 'rb') as file:
+                self.entries = {**pickle.load(file), **self.entries}
+        temp_path = pattern_cache.get_temp_path(self.path)
+        try:
+            with open(temp_path, 'wb') as file:
+                pickle.dump(self.entries, file, protocol=pickle.HIGHEST_PROTOCOL)
+            os.replace(temp_path, self.path)
+        finally:
+            if os.path.exists(temp_path):
+                os.remove(temp_path)
+        self.unsaved = False
+
+
+def load_opening_book(answers, patterns, guesses, name, source_hash, cache_dir, open_guesses=False, **kwargs):
+    name += '-book' + ('-open' if open_guesses else '')
+    path = pattern_cache.get_cache_path(cache_dir, name, source_hash, extension='.pkl')
+    if not os.path.exists(path):
+        pattern_cache.remove_stale_files(cache_dir, name, path, extension='.pkl')
+    return OpeningBook(answers, patterns, guesses, path, open_guesses=open_guesses, **kwargs)
@@ -0,0 +1,146 @@
+import glob
+import hashlib
+import os
+import tempfile
+
+import numpy as np
+import pandas as pd
+
+import feedback
+
+# Where the word lists are read from and where anything built from them is cached
+# Either can be set with an environment variable, or by changing the file and directory names in each game module
+DATA_DIR = os.environ.get('SOLVER_DATA_DIR', os.path.dirname(os.path.abspath(__file__)))
+CACHE_DIR = os.environ.get('SOLVER_CACHE_DIR', DATA_DIR)
+
+# Number of guesses to work out at a time while building a matrix on disk
+BUILD_ROWS = 1024
+
+# Number of lines to read at a time while packing a word list
+READ_ROWS = 2 ** 16
+
+
+def read_words(path):
+    return list(pd.read_csv(path, header=None, encoding='utf-8-sig').squeeze())
+
+
+def read_prior(path, words, default=1.0):
+    # The prior weight of each word, such as how common it is or whether it has been an answer before, read from
+    # lines of word,weight and lined up with the words, with any word that is not in the file given the default
+    table = pd.read_csv(path, header=None, names=['word', 'weight'], encoding='utf-8-sig')
+    lookup = dict(zip(table['word'], table['weight']))
+    return np.array([lookup.get(word, default) for word in words], dtype=np.float32)
+
+
+def load_packed_words(path, length, cache_dir):
+    # Every word in a game is the same length, so the list is packed once into a fixed width matrix on disk
+    # and memory mapped from then on, rather than being read into a list of strings every time
+    name = os.path.splitext(os.path.basename(path))[0] + '-packed'
+    packed_path = get_cache_path(cache_dir, name, hash_files(path))
+    if not os.path.exists(packed_path):
+        build_packed_words(path, length, packed_path)
+        remove_stale_files(cache_dir, name, packed_path)
+
+    return np.load(packed_path, mmap_mode='r')
+
+
+def build_packed_words(path, length, packed_path):
+    # Read the list a chunk at a time, leaving out any line that is not a word of the right length
+    blocks = [np.empty((0, length), dtype=np.uint8)]
+    for chunk in pd.read_csv(path, header=None, encoding='utf-8-sig', dtype=str, chunksize=READ_ROWS):
+        words = chunk[0].dropna()
+        words = words[words.str.len() == length]
+        if len(words):
+            blocks.append(feedback.encode_words(words))
+    save_array(packed_path, np.concatenate(blocks))
+
+
+def hash_files(*paths):
+    digest = hashlib.sha1()
+    for path in paths:
+        with open(path, 'rb') as file:
+            for block in iter(lambda: file.read(2 ** 20), b''):
+                digest.update(block)
+    return digest.hexdigest()[:16]
+
+
+def get_cache_path(cache_dir, name, source_hash, extension='.npy'):
+    # Cached files are named after a hash of the files they were built from, so any edit to them causes a rebuild
+    return os.path.join(cache_dir, name + '-' + source_hash + extension)
+
+
+def remove_stale_files(cache_dir, name, path, extension='.npy'):
+    # Only match this name followed by a hash, so other cached files that share the prefix are left alone
+    for stale_path in glob.glob(os.path.join(cache_dir, glob.escape(name) + '-' + '[0-9a-f]' * 16 + extension)):
+        if stale_path != path:
+            os.remove(stale_path)
+
+
+def get_temp_path(path):
+    # A new temporary file next to the path, to be moved over it once written, so an interrupted write never leaves
+    # a partial file behind and processes writing the same file at once each write their own copy
+    # Whichever copy is moved into place last is kept, which is fine since they are built from the same files
+    descriptor, temp_path = tempfile.mkstemp(dir=os.path.dirname(path) or '.',
+                                             prefix=os.path.basename(path) + '.', suffix='.tmp')
+    os.close(descriptor)
+
+    # mkstemp makes the file readable by its owner alone, so it is given the permissions any other new file would get
+    # instead, and keeps them once moved into place, since a cache directory may be shared with other users
+    os.chmod(temp_path, 0o666 & ~get_umask())
+    return temp_path
+
+
+def get_umask():
+    # The umask can only be read by setting it, so it is set straight back
+    umask = os.umask(0)
+    os.umask(umask)
+    return umask
+
+
+def save_array(path, array):
+    temp_path = get_temp_path(path)
+    try:
+        with open(temp_path, 'wb') as file:
+            np.save(file, array)
+        os.replace(temp_path, path)
+    finally:
+        if os.path.exists(temp_path):
+            os.remove(temp_path)
+
+
+def load_pattern_matrix(guesses, answers, name, source_hash, cache_dir):
+    path = get_cache_path(cache_dir, name, source_hash)
+    if not os.path.exists(path):
+        build_pattern_matrix(guesses, answers, path)
+        remove_stale_files(cache_dir, name, path)
+
+    return np.load(path, mmap_mode='r')
+
+
+def build_pattern_matrix(guesses, answers, path):
+    guesses = feedback.encode_words(guesses)
+    answers = feedback.encode_words(answers)
+
+    temp_path = get_temp_path(path)
+    try:
+        matrix = np.lib.format.open_memmap(temp_path, mode='w+',
+                                           dtype=feedback.get_pattern_dtype(answers.shape[1]),
+                                           shape=(len(guesses), len(answers)))
+        for start in range(0, len(guesses), BUILD_ROWS):
+            matrix[start:start + BUILD_ROWS] = feedback.get_patterns(guesses[start:start + BUILD_ROWS], answers)
+        matrix.flush()
+        del matrix
+        os.replace(temp_path, path)
+    finally:
+        if os.path.exists(temp_path):
+            os.remove(temp_path)
+
+
+def get_guess_rows(guess_count, possible_rows, open_guesses):
+    # Either only the guesses that could still be the answer, or every allowed guess
+    # Possible answers go first so they win ties, since they might also end the game
+    if not open_guesses:
+        return np.asarray(possible_rows, dtype=np.int64)
+    other_rows = np.ones(guess_count, dtype=bool)
+    other_rows[possible_rows] = False
+    return np.concatenate([np.asarray(possible_rows, dtype=np.int64), np.flatnonzero(other_rows)])
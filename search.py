@@ -0,0 +1,112 @@
+import collections
+import hashlib
+import math
+
+import numpy as np
+
+import feedback
+import pattern_cache
+
+
+class Search:
+    # Looks ahead through the game tree to find the guess that minimises the expected (or worst case) number of
+    # guesses, rather than only looking one guess ahead with entropy
+    # Only the beam_width guesses with the most entropy are tried at each position, and past max_depth guesses the
+    # rest of the game is played out greedily by entropy
+    # Results are cached by the set of remaining answers so positions reached by different guesses are only solved once
+    # With a table_size, only that many of the most recently used positions are kept, so a long lived search does not
+    # keep every position it has ever solved
+    def __init__(self, patterns, guesses, answer_rows, length, open_guesses=False, objective='expected',
+                 beam_width=10, max_depth=6, table_size=None):
+        if objective not in ('expected', 'worst'):
+            raise ValueError('objective must be expected or worst, not ' + str(objective))
+        self.patterns = patterns
+        self.guesses = guesses
+        self.answer_rows = np.asarray(answer_rows)
+        self.length = length
+        self.open_guesses = open_guesses
+        self.objective = objective
+        self.beam_width = beam_width
+        self.max_depth = max_depth
+        self.solved_pattern = 3 ** length - 1
+        self.table_size = table_size
+        self.table = collections.OrderedDict()
+
+    def rank_guesses(self, candidates, depth=None):
+        # Score every guess in the beam exactly, returning (guess, value) pairs best first
+        # The value is the expected number of guesses, or the worst case number, including this one
+        candidates = np.asarray(candidates)
+        depth = self.max_depth if depth is None else depth
+        ranked_guesses = list()
+        for row in self.get_guess_options(candidates, depth):
+            cost = self.get_guess_cost(row, candidates, depth)
+            ranked_guesses.append((feedback.get_word(self.guesses, row), self.get_value(cost, len(candidates))))
+        return sorted(ranked_guesses, key=lambda ranked_guess: ranked_guess[1])
+
+    def get_value(self, cost, candidate_count):
+        if self.objective == 'expected':
+            return cost / candidate_count
+        return cost
+
+    def get_guess_options(self, candidates, depth):
+        rows = pattern_cache.get_guess_rows(len(self.guesses), self.answer_rows[candidates], self.open_guesses)
+        entropies = feedback.get_guess_entropies(None, candidates, self.length,
+                                                 patterns=self.patterns[np.ix_(rows, candidates)])
+        return rows[np.argsort(-entropies, kind='stable')[:self.beam_width if depth > 0 else 1]]
+
+    def get_cost(self, candidates, depth):
+        # The total number of guesses to solve every candidate (or the most any one of them needs)
+        if len(candidates) == 1:
+            return 1
+
+        depth = max(depth, 0)
+        key = (hashlib.blake2b(candidates.tobytes(), digest_size=16).digest(), depth)
+        if key in self.table:
+            self.table.move_to_end(key)
+            return self.table[key]
+
+        best = math.inf
+        floor = self.get_lower_bound(len(candidates))
+        for row in self.get_guess_options(candidates, depth):
+            best = min(best, self.get_guess_cost(row, candidates, depth, limit=best))
+            if best <= floor:
+                break
+
+        self.table[key] = best
+        if self.table_size is not None and len(self.table) > self.table_size:
+            self.table.popitem(last=False)
+        return best
+
+    def get_guess_cost(self, row, candidates, depth, limit=math.inf):
+        # Anything at or above the limit is as good as infinite to the caller, so stop as soon as that is certain
+        guess_patterns = np.asarray(self.patterns[row, candidates])
+        values, inverse = np.unique(guess_patterns, return_inverse=True)
+        if len(values) == 1 and values[0] != self.solved_pattern:
+            return math.inf
+
+        # Solve the largest groups first, since they are the most likely to go over the limit
+        groups = [candidates[inverse == index] for index, value in enumerate(values) if value != self.solved_pattern]
+        groups.sort(key=len, reverse=True)
+
+        if self.objective == 'expected':
+            cost = len(candidates)
+            remaining_bound = sum(self.get_lower_bound(len(group)) for group in groups)
+            for group in groups:
+                if cost + remaining_bound >= limit:
+                    return math.inf
+                remaining_bound -= self.get_lower_bound(len(group))
+                cost += self.get_cost(group, depth - 1)
+            return cost
+
+        cost = 1
+        for group in groups:
+            if cost >= limit:
+                return math.inf
+            cost = max(cost, 1 + self.get_cost(group, depth - 1))
+        return cost
+
+    def get_lower_bound(self, candidate_count):
+        # At best one candidate is guessed straight away and every other one takes a second guess
+        if self.objective == 'expected':
+            return 2 * candidate_count - 1
+        return 1 if candidate_count == 1 else 2
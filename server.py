@@ -0,0 +1,209 @@
+import argparse
+import asyncio
+import json
+import os
+import socket
+from concurrent.futures import ProcessPoolExecutor
+
+import mathler
+import metrics
+import nerdle
+import search
+import session
+import wordle
+
+# The module and word length of each game
+GAMES = {
+    'wordle': (wordle, 5),
+    'nerdle': (nerdle, 8),
+    'mathler': (mathler, 6),
+}
+
+# Most guesses a single response can hold, every opening book keeps this many guesses for each position
+MAX_TOP_K = 100
+
+SEARCH_OBJECTIVES = ('expected', 'worst')
+
+# Most positions each search keeps solved between requests, since a worker keeps its searches for as long as it runs
+SEARCH_TABLE_SIZE = 2 ** 16
+
+
+async def serve(host='127.0.0.1', port=8765, workers=1, preload=('wordle',), metrics_prefix=None):
+    # Requests and responses are single lines of JSON, any number of them can be sent over one connection
+    # Scoring happens in a pool of worker processes, each of which loads a game's words, pattern matrix and opening
+    # books the first time it is asked about it and keeps them for every later request
+    # With a metrics prefix, each worker writes its own measurements as JSON lines to the prefix and its process id
+    # The preloaded games' cached files are built here first, so the workers do not all build them at once
+    for game in preload:
+        load_game(game)
+    with ProcessPoolExecutor(max_workers=workers, initializer=_load_worker_games,
+                             initargs=(preload, metrics_prefix)) as pool:
+        server = await asyncio.start_server(lambda reader, writer: handle_connection(reader, writer, pool), host, port)
+        print('Serving on', ', '.join(str(sock.getsockname()) for sock in server.sockets))
+        async with server:
+            await server.serve_forever()
+
+
+async def handle_connection(reader, writer, pool):
+    loop = asyncio.get_running_loop()
+    try:
+        while True:
+            line = await reader.readline()
+            if not line:
+                break
+            try:
+                request = parse_request(json.loads(line))
+                response = await loop.run_in_executor(pool, solve, request)
+            except (ValueError, TypeError, KeyError) as error:
+                response = {'error': str(error)}
+            except Exception as error:
+                # A worker that crashed (or a pool that broke) still gets the client an answer
+                response = {'error': 'The request could not be solved: ' + (str(error) or type(error).__name__)}
+            writer.write(json.dumps(response).encode() + b'\n')
+            await writer.drain()
+    finally:
+        writer.close()
+
+
+def parse_request(request):
+    # Check everything about a request up front, so a bad one is answered straight away without using a worker
+    if not isinstance(request, dict):
+        raise ValueError('A request must be a JSON object')
+    game = request.get('game')
+    if game not in GAMES:
+        raise ValueError('game must be one of ' + ', '.join(GAMES))
+    module, length = GAMES[game]
+
+    # JSON true and false would pass for 1 and 0 as Python ints, so numbers and flags are checked by exact type
+    solution = request.get('solution')
+    if game == 'mathler' and type(solution) is not int:
+        raise ValueError('A mathler request needs an integer solution')
+
+    guesses = request.get('guesses', [])
+    patterns = request.get('patterns', [])
+    if len(guesses) != len(patterns):
+        raise ValueError('There must be one pattern for every guess')
+    for guess, pattern in zip(guesses, patterns):
+        if not isinstance(guess, str) or len(guess) != length or set(guess) - set(module.ALPHABET):
+            raise ValueError('Not a valid ' + game + ' guess: ' + str(guess))
+        if not isinstance(pattern, str) or len(pattern) != length or set(pattern) - set('gyG'):
+            raise ValueError('Not a valid ' + game + ' pattern: ' + str(pattern))
+
+    top_k = request.get('top_k', 25)
+    if type(top_k) is not int or not 0 < top_k <= MAX_TOP_K:
+        raise ValueError('top_k must be between 1 and ' + str(MAX_TOP_K))
+
+    open_guesses = request.get('open_guesses', False)
+    if type(open_guesses) is not bool:
+        raise ValueError('open_guesses must be true or false')
+
+    objective = request.get('objective')
+    if objective is not None and objective not in SEARCH_OBJECTIVES:
+        raise ValueError('objective must be one of ' + ', '.join(SEARCH_OBJECTIVES))
+
+    return {
+        'game': game,
+        'solution': solution if game == 'mathler' else None,
+        'history': list(zip(guesses, patterns)),
+        'top_k': top_k,
+        'open_guesses': open_guesses,
+        'objective': objective,
+    }
+
+
+def solve(request):
+    # Rank the guesses for the position reached by the request's guesses, as (guess, score) pairs best first
+    # The score is the entropy of the guess, or its expected or worst case number of guesses with an objective
+    stopwatch = metrics.Stopwatch('server.solve')
+    state = get_game(request['game'], request['solution'])
+    game = state['session']
+    game.set_guesses(request['history'])
+    possible = game.candidates
+    stopwatch.lap('filter', candidates=len(possible))
+
+    if not len(possible):
+        ranked_guesses = list()
+    elif request['objective']:
+        key = (request['open_guesses'], request['objective'])
+        if key not in state['searches']:
+            state['searches'][key] = search.Search(state['patterns'], state['guesses'], game.answer_rows,
+                                                   game.answer_matrix.shape[1], open_guesses=request['open_guesses'],
+                                                   objective=request['objective'], table_size=SEARCH_TABLE_SIZE)
+        ranked_guesses = state['searches'][key].rank_guesses(possible)
+    else:
+        key = request['open_guesses']
+        if key not in state['books']:
+            state['books'][key] = state['get_book'](key)
+        ranked_guesses = state['books'][key].get_ranked_guesses(request['history'])
+        state['books'][key].save()
+    stopwatch.lap('rank')
+    stopwatch.stop(history=len(request['history']), candidates=len(possible))
+
+    return {
+        'game': request['game'],
+        'remaining': len(possible),
+        'guesses': [{'guess': guess, 'score': score} for guess, score in ranked_guesses[:request['top_k']]],
+    }
+
+
+def load_game(game, solution=None):
+    # The words, pattern matrix and a way to open the opening books for a game, loaded the same way as its module
+    module, _ = GAMES[game]
+    if game == 'mathler':
+        answers, guesses, patterns, get_book = module.SPEC.load(solution=solution)
+    else:
+        answers, guesses, patterns, get_book = module.SPEC.load()
+
+    return {
+        'session': session.Session(answers, patterns=patterns, guesses=guesses),
+        'patterns': patterns,
+        'guesses': guesses,
+        'get_book': get_book,
+        'books': dict(),
+        'searches': dict(),
+    }
+
+
+# Every game a worker process has loaded, keyed by (game, solution), set up by get_game
+_worker_games = dict()
+
+
+def get_game(game, solution=None):
+    key = (game, solution)
+    if key not in _worker_games:
+        _worker_games[key] = load_game(game, solution)
+    return _worker_games[key]
+
+
+def _load_worker_games(games, metrics_prefix=None):
+    if metrics_prefix:
+        # Line buffered, since workers are never shut down cleanly enough to flush anything left over
+        metrics.set_sink(metrics.JsonLinesSink(open(metrics_prefix + '.' + str(os.getpid()) + '.jsonl', 'a',
+                                                    buffering=1)))
+    for game in games:
+        get_game(game)
+
+
+def send_request(request, host='127.0.0.1', port=8765):
+    # Send one request to a running server and wait for its response
+    with socket.create_connection((host, port)) as connection:
+        connection.sendall(json.dumps(request).encode() + b'\n')
+        with connection.makefile('rb') as file:
+            return json.loads(file.readline())
+
+
+def main():
+    parser = argparse.ArgumentParser(description='Serve ranked guesses for JSON requests, one per line')
+    parser.add_argument('--host', default='127.0.0.1')
+    parser.add_argument('--port', type=int, default=8765)
+    parser.add_argument('--workers', type=int, default=1)
+    parser.add_argument('--preload', nargs='*', default=['wordle'], choices=['wordle', 'nerdle'])
+    parser.add_argument('--metrics', default=None,
+                        help='Have each worker write per stage metrics as JSON lines to this prefix and its process id')
+    args = parser.parse_args()
+
+    asyncio.run(serve(args.host, args.port, args.workers, args.preload, args.metrics))
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,268 @@
+import numpy as np
+
+import feedback
+import metrics
+
+# Most pattern counts to keep for updating entropies as guesses are made, 4 bytes each
+MAX_TRACKED_BUCKETS = 2 ** 23
+
+
+class Session:
+    # Keeps track of the answers that are still possible as guesses are made, so that each new guess only has to
+    # look at the remaining candidates, and guesses can be taken back or changed without starting over
+    # The answers and guesses can be lists of words or packed (possibly memory mapped) word matrices
+    # The answers are equally likely unless given a prior weight each, lined up with the answers
+    def __init__(self, answers, patterns=None, guesses=None, weights=None):
+        self.answers = answers
+        self.answer_matrix = feedback.encode_words(answers)
+        self.weights = None if weights is None else np.asarray(weights, dtype=np.float32)
+
+        # The pattern matrix is optional, guesses that are not rows of it are worked out directly
+        self.patterns = patterns
+        self.guesses = answers if guesses is None else guesses
+        self.guess_matrix = feedback.encode_words(self.guesses)
+
+        # The row of each answer in the guesses, or -1 if it cannot be guessed
+        if self.guesses is answers:
+            self.answer_rows = np.arange(len(answers))
+        else:
+            guess_index = {guess: row for row, guess in enumerate(feedback.decode_words(self.guess_matrix))}
+            self.answer_rows = np.array([guess_index.get(answer, -1)
+                                         for answer in feedback.decode_words(self.answer_matrix)])
+
+        self.reset()
+
+    def reset(self):
+        self.candidates = np.arange(len(self.answer_matrix), dtype=np.int32)
+        self.history = list()
+        self.tracker = None
+
+    def get_guess_row(self, guess):
+        rows = feedback.find_word(self.guess_matrix, guess)
+        return rows[0] if len(rows) else None
+
+    def apply(self, guess, pattern):
+        stopwatch = metrics.Stopwatch('session.apply')
+        row = self.get_guess_row(guess) if self.patterns is not None else None
+        previous = self.candidates
+        if row is not None:
+            guess_patterns = self.patterns[row, self.candidates]
+            self.candidates = self.candidates[guess_patterns == feedback.pattern_to_int(pattern)]
+        else:
+            self.candidates = feedback.get_matching_rows(self.answer_matrix, guess, pattern, rows=self.candidates)
+            metrics.increment('session.apply.patterns_computed', len(previous))
+        stopwatch.lap('filter', candidates=len(self.candidates))
+        metrics.increment('session.apply.candidates_pruned', len(previous) - len(self.candidates))
+
+        # When the guess rules out only a few of the candidates, they are taken out of the histograms,
+        # otherwise the histograms are put aside with the guess in case it is taken back
+        saved_tracker = None
+        if self.tracker is not None and is_small_change(len(previous) - len(self.candidates), len(self.candidates)):
+            self.tracker.update(np.setdiff1d(previous, self.candidates, assume_unique=True), -1)
+        else:
+            saved_tracker, self.tracker = self.tracker, None
+        self.history.append((guess, pattern, previous, saved_tracker))
+        stopwatch.lap('tracker')
+        stopwatch.stop(candidates=len(self.candidates))
+        return len(self.candidates)
+
+    def undo(self):
+        guess, pattern, previous, saved_tracker = self.history.pop()
+        if saved_tracker is not None:
+            self.tracker = saved_tracker
+        elif self.tracker is not None:
+            self.tracker.update(np.setdiff1d(previous, self.candidates, assume_unique=True), 1)
+        self.candidates = previous
+        return guess, pattern
+
+    def replace(self, turn, guess, pattern):
+        # Change one earlier guess, then replay the guesses that came after it
+        later_guesses = [self.undo() for _ in range(len(self.history) - turn)][::-1]
+        later_guesses[0] = (guess, pattern)
+        for later_guess, later_pattern in later_guesses:
+            self.apply(later_guess, later_pattern)
+        return len(self.candidates)
+
+    def set_guesses(self, guesses):
+        # Move to the position reached by the (guess, pattern) pairs, only undoing and applying the ones that differ
+        # from the guesses already made, so stepping back and forth through a game is cheap
+        guesses = list(guesses)
+        turn = 0
+        while turn < min(len(guesses), len(self.history)) and tuple(guesses[turn]) == self.history[turn][:2]:
+            turn += 1
+        while len(self.history) > turn:
+            self.undo()
+        for guess, pattern in guesses[turn:]:
+            self.apply(guess, pattern)
+        return len(self.candidates)
+
+    def get_entropies(self, rows):
+        # The entropy of each of the guess rows against the remaining candidates
+        # The histograms behind them are kept, so after a guess only the answers it rules out have to be taken out
+        if self.patterns is None:
+            raise ValueError('Entropies can only be tracked with a pattern matrix')
+        stopwatch = metrics.Stopwatch('session.get_entropies')
+        rows = np.asarray(rows)
+        length = self.answer_matrix.shape[1]
+        if self.tracker is not None and self.tracker.has_rows(rows):
+            metrics.increment('session.get_entropies.tracked')
+            entropies = self.tracker.get_entropies(rows)
+        elif not self.can_track(rows):
+            metrics.increment('session.get_entropies.patterns_evaluated', len(rows) * len(self.candidates))
+            entropies = feedback.get_guess_entropies(None, self.candidates, length, patterns=self.patterns,
+                                                     weights=self.get_weights(), rows=rows, columns=self.candidates)
+        else:
+            metrics.increment('session.get_entropies.patterns_evaluated', len(rows) * len(self.candidates))
+            self.tracker = EntropyTracker(self.patterns, rows, self.candidates, length)
+            entropies = self.tracker.get_entropies(rows)
+        stopwatch.stop(guesses=len(rows), candidates=len(self.candidates))
+        return entropies
+
+    def can_track(self, rows):
+        # With fewer candidates than patterns scoring from scratch is quicker than building the histograms,
+        # and with too many guesses there would be too many histograms to keep
+        # The histograms only hold whole counts, so weighted answers are always scored from scratch
+        size = 3 ** self.answer_matrix.shape[1]
+        return self.weights is None and len(self.candidates) >= size and len(rows) * size <= MAX_TRACKED_BUCKETS
+
+    def get_top_entropies(self, rows, top_k):
+        # The top_k of the guess rows by entropy against the remaining candidates, as indexes into rows and their
+        # entropies, best first and in the order of rows on ties
+        # The histograms are used when they are already kept for the rows, but are not built just for this, since most
+        # guesses rule out too many candidates for them to be kept up to date to the next one
+        # Otherwise (unless most of the guesses would be scored anyway) only the guesses whose bound could reach the
+        # top_k are scored at all
+        if self.patterns is None:
+            raise ValueError('Entropies can only be tracked with a pattern matrix')
+        rows = np.asarray(rows)
+        length = self.answer_matrix.shape[1]
+        weights = self.get_weights()
+
+        stopwatch = metrics.Stopwatch('session.get_top_entropies')
+
+        def score(indexes):
+            metrics.increment('session.get_top_entropies.guesses_scored', len(indexes))
+            metrics.increment('session.get_top_entropies.patterns_evaluated', len(indexes) * len(self.candidates))
+            return feedback.get_guess_entropies(None, self.candidates, length, patterns=self.patterns,
+                                                weights=weights, rows=rows[indexes], columns=self.candidates)
+
+        if ((self.tracker is not None and self.tracker.has_rows(rows))
+                or len(rows) <= 4 * top_k or len(rows) * len(self.candidates) <= feedback.CHUNK_PAIRS):
+            entropies = self.get_entropies(rows)
+            order = np.argsort(-entropies, kind='stable')[:top_k]
+            stopwatch.lap('score')
+            stopwatch.stop(guesses=len(rows), candidates=len(self.candidates))
+            return order, entropies[order]
+
+        bounds = feedback.get_entropy_bounds(self.guess_matrix[rows], self.answer_matrix[self.candidates], weights)
+        stopwatch.lap('bound')
+        order, entropies = feedback.get_top_entropies(bounds, top_k, score)
+        stopwatch.lap('score')
+        stopwatch.stop(guesses=len(rows), candidates=len(self.candidates))
+        return order, entropies
+
+    def get_sampled_entropies(self, rows, sample_size, rescore, confidence=0.95, seed=0):
+        # For candidate sets too large to score exactly, the entropy of each of the guess rows is estimated from a
+        # random sample of the candidates (drawn by weight if they have weights), then the rescore guesses whose
+        # intervals reach highest are scored exactly against every candidate
+        # Returns the entropies along with the half width of each one's approximate interval, 0 for the exact ones
+        if self.patterns is None:
+            raise ValueError('Entropies can only be tracked with a pattern matrix')
+        rows = np.asarray(rows)
+        if len(self.candidates) <= sample_size:
+            return self.get_entropies(rows), np.zeros(len(rows))
+
+        stopwatch = metrics.Stopwatch('session.get_sampled_entropies')
+        length = self.answer_matrix.shape[1]
+        weights = self.get_weights()
+        rng = np.random.default_rng(seed)
+        if weights is None:
+            sample = np.sort(rng.choice(self.candidates, sample_size, replace=False))
+        else:
+            weights = weights.astype(np.float64)
+            sample = np.sort(rng.choice(self.candidates, sample_size, p=weights / weights.sum()))
+        entropies, half_widths = feedback.get_sampled_entropies(None, self.answer_matrix[sample], length,
+                                                                patterns=self.patterns[np.ix_(rows, sample)],
+                                                                confidence=confidence, seed=seed)
+        stopwatch.lap('sample', patterns_evaluated=len(rows) * sample_size)
+
+        top = np.argsort(-(entropies + half_widths), kind='stable')[:rescore]
+        entropies[top] = feedback.get_guess_entropies(None, self.candidates, length, patterns=self.patterns,
+                                                      weights=self.get_weights(), rows=rows[top],
+                                                      columns=self.candidates)
+        half_widths[top] = 0
+        stopwatch.lap('rescore', patterns_evaluated=len(top) * len(self.candidates))
+        stopwatch.stop(guesses=len(rows), candidates=len(self.candidates))
+        return entropies, half_widths
+
+    def get_weights(self):
+        return self.weights[self.candidates] if self.weights is not None else None
+
+    def get_guesses(self):
+        return [(guess, pattern) for guess, pattern, _, _ in self.history]
+
+    def get_possible_words(self):
+        return feedback.decode_words(self.answer_matrix[self.candidates])
+
+
+def is_small_change(changed_count, candidate_count):
+    # Updating the histograms for one candidate costs a few times as much as scoring one from scratch
+    return changed_count * 3 <= candidate_count
+
+
+class EntropyTracker:
+    # The pattern histogram of each of a set of guesses against the remaining candidates, along with the sum of
+    # count * log2(count) over each histogram, from which the entropy follows
+    # Taking a candidate out or putting it back only changes one bucket of each histogram, so after a guess
+    # only the candidates it ruled out have to be looked at rather than all of the ones that are left
+    def __init__(self, patterns, rows, candidates, length):
+        self.patterns = patterns
+        self.rows = rows
+        self.positions = np.full(len(patterns), -1, dtype=np.int64)
+        self.positions[rows] = np.arange(len(rows))
+        self.candidate_count = len(candidates)
+        self.size = 3 ** length
+
+        self.counts = np.zeros((len(rows), self.size), dtype=np.int32)
+        chunk_size = max(1, feedback.CHUNK_PAIRS // max(len(candidates), self.size))
+        for start in range(0, len(rows), chunk_size):
+            block = self.patterns[np.ix_(rows[start:start + chunk_size], candidates)]
+            self.counts[start:start + len(block)] = feedback.get_pattern_counts(block, length)
+
+        # count * log2(count) for every count a bucket can have, and how much it changes when one is added or removed
+        information = get_information(np.arange(len(patterns[0]) + 2))
+        self.changes = {1: information[1:] - information[:-1], -1: np.append(0, information[:-2] - information[1:-1])}
+        self.sums = information[self.counts].sum(axis=1)
+
+        # The counts are stored pattern by pattern, since most answers give the same few patterns for most guesses
+        self.counts = self.counts.T.ravel()
+        self.positions_in_row = np.arange(len(rows), dtype=np.int64)
+
+    def has_rows(self, rows):
+        return bool((self.positions[rows] >= 0).all())
+
+    def update(self, answers, sign):
+        # Take the answers out of (or put them back into) every histogram, one answer at a time
+        # since each one only falls in one bucket of each histogram
+        changes = self.changes[sign]
+        chunk_size = max(1, feedback.CHUNK_PAIRS // max(len(self.rows), 1))
+        for start in range(0, len(answers), chunk_size):
+            block = np.asarray(self.patterns[np.ix_(self.rows, answers[start:start + chunk_size])], dtype=np.int64)
+            for answer_patterns in block.T * len(self.rows):
+                buckets = answer_patterns + self.positions_in_row
+                counts = self.counts[buckets]
+                self.sums += changes[counts]
+                self.counts[buckets] = counts + sign
+        self.candidate_count += sign * len(answers)
+
+    def get_entropies(self, rows):
+        if not self.candidate_count:
+            return np.zeros(len(rows))
+        entropies = np.log2(self.candidate_count) - self.sums[self.positions[rows]] / self.candidate_count
+
+        # Rounded so that rounding errors built up over many updates do not split guesses with the same entropy
+        return np.round(entropies, 12)
+
+
+def get_information(counts):
+    return counts * np.log2(np.maximum(counts, 1))
@@ -0,0 +1,132 @@
+import collections
+from concurrent.futures import ProcessPoolExecutor
+
+import numpy as np
+
+import feedback
+import mathler
+import nerdle
+import pattern_cache
+import wordle
+
+
+def simulate_wordle(first_guess='tares', open_guesses=False, max_turns=6, workers=1):
+    answers, guesses, patterns, _ = wordle.SPEC.load()
+    turns = simulate(answers, patterns, guesses, first_guess, open_guesses, workers)
+    return summarize(turns, max_turns)
+
+
+def simulate_nerdle(first_guess='2*4+5=13', open_guesses=False, max_turns=6, workers=1):
+    answers, _, patterns, _ = nerdle.SPEC.load()
+    answers = feedback.decode_words(answers)
+    turns = simulate(answers, patterns, answers, first_guess, open_guesses, workers)
+    return summarize(turns, max_turns)
+
+
+def simulate_mathler(solutions=range(999), open_guesses=False, max_turns=6, workers=1):
+    # Every solution has its own set of equations, so each one is played as a separate dictionary
+    turns = dict()
+    for solution in solutions:
+        answers = mathler.get_solution_equations(solution)
+        if answers:
+            patterns = mathler.get_pattern_matrix(answers, solution)
+            turns.update(simulate(answers, patterns, answers, None, open_guesses, workers))
+    return summarize(turns, max_turns)
+
+
+def simulate(answers, patterns, guesses, first_guess=None, open_guesses=False, workers=1):
+    # Play every answer at once by always making the guess with the most entropy
+    # The guess only depends on the answers that are still possible, so rather than playing each game separately
+    # the answers are split by the pattern each guess gives, and every group is played out once for all of its answers
+    guess_index = {guess: row for row, guess in enumerate(guesses)}
+    answer_rows = np.array([guess_index[answer] for answer in answers])
+    length = len(answers[0])
+    candidates = np.arange(len(answers))
+
+    if first_guess is None:
+        first_row = get_best_guess(patterns, answer_rows, candidates, length, open_guesses)
+    else:
+        first_row = guess_index[first_guess]
+    groups = split_candidates(patterns, first_row, candidates, length)
+
+    turns = dict()
+    if workers > 1 and isinstance(patterns, np.memmap):
+        # Each worker memory maps the cached matrix itself, so only the answer indices are sent to it
+        with ProcessPoolExecutor(max_workers=workers, initializer=_load_worker_state,
+                                 initargs=(patterns.filename, answer_rows, length, open_guesses)) as pool:
+            for group_turns in pool.map(_play_group, groups):
+                turns.update(group_turns)
+    else:
+        for group, solved in groups:
+            turns.update(play_group(patterns, answer_rows, group, solved, 1, length, open_guesses))
+
+    return {answers[index]: turn for index, turn in turns.items()}
+
+
+def play_group(patterns, answer_rows, group, solved, turn, length, open_guesses):
+    # A group that was solved by the last guess needs no more guesses
+    if solved:
+        return {index: turn for index in group}
+    return play(patterns, answer_rows, group, turn, length, open_guesses)
+
+
+def play(patterns, answer_rows, candidates, turn, length, open_guesses):
+    # Work out how many guesses each of the candidates takes, given the number of guesses already made
+    if len(candidates) == 1:
+        return {candidates[0]: turn + 1}
+
+    guess_row = get_best_guess(patterns, answer_rows, candidates, length, open_guesses)
+    turns = dict()
+    for group, solved in split_candidates(patterns, guess_row, candidates, length):
+        turns.update(play_group(patterns, answer_rows, group, solved, turn + 1, length, open_guesses))
+    return turns
+
+
+def split_candidates(patterns, guess_row, candidates, length):
+    # Group the candidates by the pattern the guess gives them, and whether that pattern is all green
+    guess_patterns = np.asarray(patterns[guess_row, candidates])
+    return [(candidates[guess_patterns == pattern], pattern == 3 ** length - 1)
+            for pattern in np.unique(guess_patterns)]
+
+
+def get_best_guess(patterns, answer_rows, candidates, length, open_guesses):
+    rows = pattern_cache.get_guess_rows(len(patterns), answer_rows[candidates], open_guesses)
+    entropies = feedback.get_guess_entropies(None, candidates, length, patterns=patterns[np.ix_(rows, candidates)])
+    return rows[np.argmax(entropies)]
+
+
+def summarize(turns, max_turns):
+    histogram = collections.Counter(turns.values())
+    failures = sorted(answer for answer, turn in turns.items() if turn > max_turns)
+    average = sum(turns.values()) / len(turns) if turns else 0
+
+    print(len(turns), 'Games Played')
+    print('Average Guesses:', round(average, 3))
+    for turn in sorted(histogram):
+        print(turn, histogram[turn])
+    print(len(failures), 'Failures')
+
+    return {
+        'games': len(turns),
+        'average': average,
+        'histogram': dict(sorted(histogram.items())),
+        'failures': failures,
+        'turns': turns,
+    }
+
+
+# The pattern matrix and answer rows each worker process plays with, set up once by _load_worker_state
+_worker_state = dict()
+
+
+def _load_worker_state(path, answer_rows, length, open_guesses):
+    _worker_state['patterns'] = np.load(path, mmap_mode='r')
+    _worker_state['answer_rows'] = answer_rows
+    _worker_state['length'] = length
+    _worker_state['open_guesses'] = open_guesses
+
+
+def _play_group(task):
+    group, solved = task
+    return play_group(_worker_state['patterns'], _worker_state['answer_rows'], group, solved, 1,
+                      _worker_state['length'], _worker_state['open_guesses'])
@@ -0,0 +1,345 @@
+import copy
+import itertools
+import math
+
+import numpy as np
+import pandas as pd
+
+import feedback
+import metrics
+import pattern_cache
+import search
+import session
+import word_store
+
+
+class GameSpec:
+    # Everything that differs between the games, so the same solver can play any of them
+    # load takes the game's options (such as the Mathler solution) and returns the possible answers, the allowed
+    # guesses, the pattern matrix of the guesses against the answers, and a function that opens the opening book
+    # for a given open_guesses, so the vocabulary and any filtering of the answers are up to each game
+    def __init__(self, name, length, alphabet, load, noun='words'):
+        self.name = name
+        self.length = length
+        self.alphabet = alphabet
+        self.load = load
+        self.noun = noun
+        self.pattern_count = 3 ** length
+
+
+def play(spec, guesses=(), open_guesses=False, top_k=25, workers=1, use_book=False, search_objective=None,
+         prior_file=None, prune=False, sample_size=None, rescore=1000, confidence=0.95, verbose=False, **options):
+    answers, all_guesses, patterns, get_book = spec.load(**options)
+
+    # A prior makes some answers more likely than others, otherwise every answer is as likely as any other
+    weights = pattern_cache.read_prior(prior_file, answers) if prior_file else None
+    game = session.Session(answers, patterns=patterns, guesses=all_guesses, weights=weights)
+
+    # Each guess narrows the possible answers down to the ones that would have given the same pattern
+    for guess, pattern in guesses:
+        if guess:
+            game.apply(guess, pattern)
+            if verbose:
+                print('Finding', spec.noun, 'matching', guess, pattern)
+                print(len(game.candidates), spec.noun, 'found')
+    possible = game.candidates
+    words = word_store.WordStore(game.answer_matrix, spec.alphabet, weights=weights)
+    possible_words = words.subset(possible)
+
+    print(len(possible_words), 'Possible Words Remaining')
+
+    # Look ahead through the rest of the game for the guesses with the fewest expected (or worst case) guesses
+    if search_objective:
+        solver = search.Search(patterns, all_guesses, game.answer_rows, spec.length, open_guesses=open_guesses,
+                               objective=search_objective)
+        print('Best Guesses ({}):'.format(search_objective))
+        for word, value in solver.rank_guesses(possible)[:top_k]:
+            print(word, round(value, 3))
+        print()
+        return
+
+    # The ranking for the opening and for the reply to each first guess is looked up rather than scored
+    # The book is scored without a prior, so it is only used when there is none, and it only keeps its best book.size
+    # guesses for each position, so a longer list is scored instead
+    book = get_book(open_guesses) if use_book and not verbose and weights is None else None
+    if book is not None and top_k <= book.size:
+        ranked_guesses = book.get_ranked_guesses(game.get_guesses())
+        book.save()
+
+        print('Most Useful Words:')
+        for word, entropy in ranked_guesses[:top_k]:
+            print(word, round(entropy, 3))
+        print()
+        return
+
+    rows = pattern_cache.get_guess_rows(len(game.guess_matrix), game.answer_rows[possible], open_guesses)
+
+    # With more candidates than the sample size every guess is estimated from a sample of them, and the rescore
+    # guesses that come out on top are scored exactly, so only estimates have an interval
+    if sample_size and not verbose and len(possible) > sample_size:
+        entropies, half_widths = game.get_sampled_entropies(rows, sample_size, rescore, confidence=confidence)
+        order = np.argsort(-entropies, kind='stable')
+        ranked = [(feedback.get_word(all_guesses, rows[index]), round(entropies[index], 3),
+                   ' +/- ' + str(round(half_widths[index], 3)) if half_widths[index] else '') for index in order]
+        print('Estimated from', sample_size, spec.noun, 'with approximate',
+              str(round(confidence * 100)) + '% intervals allowing for sampling bias')
+
+        print('Most Useful Words:')
+        for word, entropy, interval in ranked[:top_k]:
+            print(word, str(entropy) + interval)
+        print()
+        if len(ranked) >= 2 * top_k:
+            print('Least Useful Words:')
+            for word, entropy, interval in ranked[-top_k:]:
+                print(word, str(entropy) + interval)
+            print()
+        return
+
+    # Pruning only scores as many guesses as it takes to find the most useful ones, so the least useful are not known
+    # The session copies the patterns of only the guesses it scores out of the matrix
+    if prune and not verbose:
+        order, entropies = game.get_top_entropies(rows, top_k)
+        print('Most Useful Words:')
+        for index, entropy in zip(order, entropies):
+            print(feedback.get_word(all_guesses, rows[index]), round(entropy, 3))
+        print()
+        return
+
+    guess_words = words if all_guesses is answers else word_store.WordStore(game.guess_matrix, spec.alphabet)
+    entropies = get_entropies(spec, possible_words, verbose=verbose, patterns=patterns, rows=rows, columns=possible,
+                              workers=workers, keep_probabilities=verbose, guesses=guess_words.subset(rows))
+
+    # Print the most useful words
+    print('Most Useful Words:')
+    for word, entropy in list(zip(entropies.index, entropies['entropy']))[:top_k]:
+        print(word, round(entropy, 3))
+    print()
+
+    # Print the least useful words
+    if len(entropies) >= 2 * top_k:
+        print('Least Useful Words:')
+        for word, entropy in list(zip(entropies.index, entropies['entropy']))[-top_k:]:
+            print(word, round(entropy, 3))
+        print()
+
+
+def play_boards(spec, guesses, board_patterns, open_guesses=False, top_k=25, verbose=False, **options):
+    # Several boards played at once with the same guesses (Dordle, Quordle, Octordle), each board with its own answer
+    # and so its own list of patterns, ranking each guess by its entropy summed over the boards that are not solved yet
+    # Since the boards' answers are independent, the summed entropy is also the entropy of the patterns seen together
+    answers, all_guesses, patterns, _ = spec.load(**options)
+    template = session.Session(answers, patterns=patterns, guesses=all_guesses)
+
+    # Every board shares the template's words, only the candidates are kept for each one
+    boards = list()
+    for board, patterns_for_board in enumerate(board_patterns, 1):
+        game = copy.copy(template)
+        game.reset()
+        for guess, pattern in zip(guesses, patterns_for_board):
+            game.apply(guess, pattern)
+        if 'G' * spec.length in patterns_for_board:
+            print('Board', board, 'Solved')
+        else:
+            print('Board', board, len(game.candidates), 'Possible Words Remaining')
+            boards.append(game.candidates)
+            if verbose:
+                print(', '.join(game.get_possible_words()[:top_k]))
+    print()
+    if not boards:
+        return
+
+    stopwatch = metrics.Stopwatch(spec.name + '.play_boards')
+    possible_rows = np.unique(np.concatenate([template.answer_rows[candidates] for candidates in boards]))
+    rows = pattern_cache.get_guess_rows(len(template.guess_matrix), possible_rows, open_guesses)
+    entropies = feedback.get_board_entropies(patterns, rows, boards, spec.length)
+    totals = entropies.sum(axis=1)
+    order = np.argsort(-totals, kind='stable')[:top_k]
+    stopwatch.stop(guesses=len(rows), boards=len(boards))
+
+    print('Most Useful Words:')
+    for index in order:
+        word = feedback.get_word(all_guesses, rows[index])
+        if verbose:
+            print(word, round(totals[index], 3), [round(float(entropy), 3) for entropy in entropies[index]])
+        else:
+            print(word, round(totals[index], 3))
+    print()
+
+
+def get_possible_words(spec, all_words, guess, pattern, yellow_dict, verbose=False):
+    stopwatch = metrics.Stopwatch(spec.name + '.get_possible_words')
+    result = list(zip(guess, pattern))
+
+    green_letters = [letter for letter, key in result if key == 'G']
+    yellow_letters = [letter for letter, key in result if key == 'y']
+    grey_letters = [letter for letter, key in result if key == 'g']
+
+    # The words can be packed into a store once by the caller and passed in when filtering the same list repeatedly,
+    # in which case the words that are still possible come back as a subset of the store rather than a new list
+    if isinstance(all_words, word_store.WordStore):
+        store = all_words
+    else:
+        store = word_store.WordStore(all_words, spec.alphabet)
+
+    # We know the letters that are green are in that exact position
+    # Letters that are any other color can be anything but that letter
+    possible = store.subset(store.get_position_mask(guess, pattern))
+    stopwatch.lap('positions', candidates=len(possible))
+    if verbose:
+        print('Finding', spec.noun, 'matching positions:', ''.join(letter if key == 'G' else '[^' + letter + ']'
+                                                                   for letter, key in result))
+        print(len(possible), spec.noun, 'found')
+
+    # We know that for each yellow letter, there is at least that many of them in the word
+    # For example, a yellow S in a single guess means there is at least 1 S
+    # Two yellow P's in a single guess means there is at least 2 P's
+    yellow_dict = {letter: max(yellow_letters.count(letter) + green_letters.count(letter), count)
+                   for letter, count in yellow_dict.items()}
+    possible = possible.subset(possible.get_count_mask(yellow_dict))
+    stopwatch.lap('letters', candidates=len(possible))
+    if verbose:
+        print('Finding', spec.noun, 'containing all of:',
+              ''.join([letter * count for letter, count in yellow_dict.items()]))
+        print(len(possible), spec.noun, 'found')
+
+    # We know the letters that are grey are not in the word, if they are not also green or yellow
+    # Therefore words that contain grey letters, that are only grey, are not possible
+    # Furthermore, if the letter is also green or yellow in a guess, we know there are exactly that many in the word
+    exact_counts = {letter: green_letters.count(letter) + yellow_letters.count(letter) for letter in set(grey_letters)}
+    before_grey = len(possible)
+    possible = possible.subset(possible.get_count_mask(exact_counts, exact=True))
+    stopwatch.lap('grey', candidates=len(possible))
+    metrics.increment(spec.name + '.get_possible_words.grey_pruned', before_grey - len(possible))
+    if verbose:
+        print('Finding', spec.noun, 'that do not contain any of:',
+              set(grey_letters) - set(green_letters) - set(yellow_letters))
+        print(len(possible), spec.noun, 'found')
+
+    possible_words = possible if store is all_words else possible.decode()
+    stopwatch.stop(words=len(store))
+    return possible_words, yellow_dict
+
+
+def get_entropies(spec, words, verbose=False, patterns=None, guesses=None, workers=1, keep_probabilities=True,
+                  top_k=None, rows=None, columns=None):
+    # Score each guess against the possible answers, which are the guesses themselves unless told otherwise
+    # Either can be a list of words or a word store, and both are scored in the store's encoding
+    # If the answers' store has prior weights, each answer is as likely as its share of the total weight
+    # With top_k only the best top_k guesses are returned, and only the guesses that might be among them are scored
+    # With rows or columns the patterns are a whole (possibly memory mapped) matrix, whose rows and columns line up
+    # with the guesses and answers, and only the patterns being scored are copied out of it
+    stopwatch = metrics.Stopwatch(spec.name + '.get_entropies')
+    words, guesses = word_store.get_word_stores(words, guesses, spec.alphabet)
+    labels = guesses.decode()
+    guess_matrix, word_matrix = guesses.get_matrix(), words.get_matrix()
+    weights = words.get_weights()
+    stopwatch.lap('encode')
+
+    # Guesses are scored a few at a time in order of a bound on their entropy until the rest cannot make the top_k
+    if top_k is not None:
+        bounds = feedback.get_entropy_bounds(guess_matrix, word_matrix, weights)
+        stopwatch.lap('bound')
+
+        def score(indexes):
+            metrics.increment(spec.name + '.get_entropies.patterns_evaluated', len(indexes) * len(words))
+            if patterns is None:
+                metrics.increment(spec.name + '.get_entropies.patterns_computed', len(indexes) * len(words))
+                return feedback.get_guess_entropies(guess_matrix[indexes], word_matrix, spec.length, weights=weights)
+            return feedback.get_guess_entropies(None, word_matrix, spec.length, patterns=patterns, weights=weights,
+                                                rows=indexes if rows is None else rows[indexes], columns=columns)
+
+        indexes, entropies = feedback.get_top_entropies(bounds, top_k, score)
+        stopwatch.lap('score')
+        stopwatch.stop(guesses=len(guesses), answers=len(words))
+        return pd.DataFrame({'entropy': entropies}, index=[labels[index] for index in indexes])
+
+    # Patterns that are passed in were looked up from the cached matrix rather than worked out here
+    metrics.increment(spec.name + '.get_entropies.patterns_evaluated', len(guesses) * len(words))
+    if patterns is None:
+        metrics.increment(spec.name + '.get_entropies.patterns_computed', len(guesses) * len(words))
+
+    # The full table of pattern probabilities is large, so skip it when only the entropy is wanted
+    if not keep_probabilities:
+        if workers > 1:
+            entropies = feedback.get_guess_entropies_parallel(guess_matrix, word_matrix, spec.length, workers,
+                                                              patterns=patterns, weights=weights, rows=rows,
+                                                              columns=columns)
+        else:
+            entropies = feedback.get_guess_entropies(guess_matrix, word_matrix, spec.length, patterns=patterns,
+                                                     weights=weights, rows=rows, columns=columns)
+        stopwatch.lap('score')
+        lookup = pd.DataFrame({'entropy': entropies}, index=labels)
+        if verbose:
+            for word, entropy in zip(labels, entropies):
+                print(word, round(entropy, 3))
+            stopwatch.lap('print')
+
+        # Sort the guesses by the amount of information they give, keeping their order on ties
+        lookup = lookup.sort_values(by='entropy', ascending=False, kind='stable')
+        stopwatch.lap('sort')
+        stopwatch.stop(guesses=len(guesses), answers=len(words))
+        return lookup
+
+    # Work out the pattern each guess would give against every possible answer in one batch,
+    # then count how many answers fall under each pattern
+    if workers > 1:
+        counts = feedback.get_pattern_counts_parallel(guess_matrix, word_matrix, spec.length, workers,
+                                                      patterns=patterns, weights=weights, rows=rows, columns=columns)
+    else:
+        if patterns is None:
+            patterns = feedback.get_patterns(guess_matrix, word_matrix)
+        else:
+            patterns = feedback.get_pattern_block(patterns, 0, len(guesses), rows, columns)
+        counts = feedback.get_pattern_counts(patterns, spec.length, weights=weights)
+    stopwatch.lap('score')
+
+    # Fill in the probability of every pattern and the entropy, then build the table from it in one go
+    table = np.empty((len(guesses), spec.pattern_count + 1))
+    np.divide(counts, len(words) if weights is None else weights.sum(dtype=np.float64), out=table[:, :-1])
+    table[:, -1] = feedback.get_entropies_from_counts(counts)
+    lookup = pd.DataFrame(table,
+                          index=labels,
+                          columns=[''.join(pattern) for pattern in
+                                   itertools.product(feedback.PATTERN_KEYS, repeat=spec.length)] + ['entropy'],
+                          copy=False)
+    stopwatch.lap('table')
+
+    if verbose:
+        for word, word_probabilities in zip(labels, table[:, :-1]):
+            print(word)
+            get_entropy(spec, word_probabilities, verbose=verbose)
+            print()
+        stopwatch.lap('print')
+
+    # Sort the guesses by the amount of information they give, keeping their order on ties
+    lookup = lookup.sort_values(by='entropy', ascending=False, kind='stable')
+    stopwatch.lap('sort')
+    stopwatch.stop(guesses=len(guesses), answers=len(words))
+
+    return lookup
+
+
+def get_entropy(spec, probabilities, verbose=False):
+    stopwatch = metrics.Stopwatch(spec.name + '.get_entropy')
+    pattern_count = len(probabilities)
+    probabilities = [prob for prob in probabilities if prob > 0]
+    metrics.increment(spec.name + '.get_entropy.patterns_pruned', pattern_count - len(probabilities))
+    if verbose:
+        print(len(probabilities), 'nonzero probabilities')
+        print(sum(probabilities))
+    if abs(sum(probabilities) - 1) > 1e-6:
+        print(round(sum(probabilities), 3), 'is not 1')
+
+    entropy = sum([probability * math.log(1 / probability, 2) for probability in probabilities])
+    if verbose:
+        for probability in probabilities:
+            print(round(probability, 3), '*',
+                  round(math.log(1 / probability, 2), 3), '=',
+                  round(probability * math.log(1 / probability, 2), 3))
+        print('total entropy:', round(entropy, 3))
+
+    if entropy > math.log(spec.pattern_count, 2):
+        print('Impossible Entropy')
+
+    stopwatch.stop(patterns=len(probabilities))
+    return entropy
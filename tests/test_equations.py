@@ -0,0 +1,137 @@
+import itertools
+import random
+import re
+from fractions import Fraction
+
+import pytest
+
+import equations
+
+CHARACTERS = '0123456789+-*/'
+
+
+def reference_evaluate(expression, integer_division=False):
+    # Split into terms at each + and -, then work through each term's * and / from left to right with exact
+    # fractions, requiring each division to come out whole with integer division
+    # Returns None for anything that is not numbers joined by operators, or that divides by zero
+    tokens = re.findall(r'\d+|[-+*/]', expression)
+    if ''.join(tokens) != expression or not tokens or not all(
+            token.isdigit() == (index % 2 == 0) for index, token in enumerate(tokens)) or not tokens[-1].isdigit():
+        return None
+
+    total = Fraction(0)
+    signs = ['+'] + [token for token in tokens[1::2] if token in '+-']
+    terms = [list()]
+    for token in tokens:
+        if token in '+-':
+            terms.append(list())
+        else:
+            terms[-1].append(token)
+
+    for sign, term in zip(signs, terms):
+        value = Fraction(int(term[0]))
+        for op, operand in zip(term[1::2], term[2::2]):
+            if op == '*':
+                value *= int(operand)
+            elif int(operand) == 0:
+                return None
+            else:
+                value /= int(operand)
+                if integer_division and value.denominator != 1:
+                    return None
+        total += value if sign == '+' else -value
+    return total
+
+
+def has_leading_zero(expression):
+    return any(len(number) > 1 and number[0] == '0' for number in re.findall(r'\d+', expression))
+
+
+def brute_force_expressions(length, integer_division=False):
+    # Every string of the length with at least one operator, no operand written with a leading zero,
+    # and a whole value, along with that value
+    expressions = dict()
+    for characters in itertools.product(CHARACTERS, repeat=length):
+        expression = ''.join(characters)
+        if expression.isdigit() or has_leading_zero(expression):
+            continue
+        value = reference_evaluate(expression, integer_division)
+        if value is not None and value.denominator == 1:
+            expressions[expression] = int(value)
+    return expressions
+
+
+def generated_expressions(length, integer_division=False, minimum=None, maximum=None):
+    generated = dict()
+    for expressions, values in equations.generate_expressions(length, integer_division=integer_division,
+                                                              minimum=minimum, maximum=maximum):
+        generated.update(zip(expressions, values.tolist()))
+    return generated
+
+
+def test_reference_evaluate_examples():
+    assert reference_evaluate('1+2*3') == 7
+    assert reference_evaluate('8/3*3') == 8
+    assert reference_evaluate('8/3*3', integer_division=True) is None
+    assert reference_evaluate('9-6/3') == 7
+    assert reference_evaluate('5/0') is None
+    assert reference_evaluate('+5') is None
+
+
+@pytest.mark.parametrize('length', [1, 2, 3, 4])
+def test_evaluate_matches_reference_for_every_string(length):
+    for characters in itertools.product(CHARACTERS, repeat=length):
+        expression = ''.join(characters)
+        assert equations.evaluate(expression) == reference_evaluate(expression), expression
+
+
+def test_evaluate_matches_reference_for_longer_expressions():
+    rng = random.Random(0)
+    for _ in range(20000):
+        # Mostly digits, so most strings are valid expressions
+        expression = ''.join(rng.choice('0123456789' * 3 + '+-*/') for _ in range(rng.randint(5, 10)))
+        assert equations.evaluate(expression) == reference_evaluate(expression), expression
+
+
+@pytest.mark.parametrize('integer_division', [False, True])
+@pytest.mark.parametrize('length', [3, 4])
+def test_generate_expressions_matches_brute_force(length, integer_division):
+    assert generated_expressions(length, integer_division) == brute_force_expressions(length, integer_division)
+
+
+def test_generate_expressions_within_bounds():
+    expected = {expression: value for expression, value in brute_force_expressions(4).items() if 5 <= value <= 20}
+    assert generated_expressions(4, minimum=5, maximum=20) == expected
+
+
+def test_generate_expressions_across_chunks(monkeypatch):
+    # Templates with more operand combinations than a chunk holds are evaluated over several chunks
+    expected = generated_expressions(5, integer_division=True)
+    monkeypatch.setattr(equations, 'CHUNK_SIZE', 37)
+    assert generated_expressions(5, integer_division=True) == expected
+
+
+def test_generated_values_match_evaluate():
+    for integer_division in (False, True):
+        for expression, value in generated_expressions(5, integer_division).items():
+            assert equations.evaluate(expression) == value
+            assert reference_evaluate(expression, integer_division) == value
+
+
+def test_create_nerdle_equations_matches_brute_force():
+    # An equation is an expression, an equals sign and its non negative value written out without a leading zero
+    expected = set()
+    for expression_length in range(3, 5):
+        for expression, value in brute_force_expressions(expression_length).items():
+            if value >= 0 and len(str(value)) == 6 - expression_length - 1:
+                expected.add(expression + '=' + str(value))
+    created = equations.create_nerdle_equations(6)
+    assert len(created) == len(set(created))
+    assert set(created) == expected
+
+
+def test_create_mathler_equations_matches_brute_force():
+    expected = {expression for expression, value in brute_force_expressions(4, True).items() if 0 <= value <= 50}
+    created = equations.create_mathler_equations(4, integer_division=True, maximum=50)
+    assert len(created) == len(set(created))
+    assert set(created) == expected
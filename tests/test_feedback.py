@@ -0,0 +1,173 @@
+import collections
+import itertools
+import random
+
+import numpy as np
+import pytest
+
+import feedback
+
+# Small alphabets make repeated letters, and so the yellow rules, come up in most pairs of words
+ALPHABETS = ['ab', 'abc', 'abcd']
+
+
+def reference_score(guess, answer):
+    # The official rule in its plainest form: greens in one pass, then yellows from left to right in a second pass,
+    # each one using up a copy of the letter from the answer's letters that are not green
+    pattern = ['g'] * len(guess)
+    remaining = collections.Counter()
+    for position, (letter, answer_letter) in enumerate(zip(guess, answer)):
+        if letter == answer_letter:
+            pattern[position] = 'G'
+        else:
+            remaining[answer_letter] += 1
+    for position, letter in enumerate(guess):
+        if pattern[position] == 'g' and remaining[letter] > 0:
+            pattern[position] = 'y'
+            remaining[letter] -= 1
+    return ''.join(pattern)
+
+
+def random_words(rng, count, length, alphabet):
+    return [''.join(rng.choice(alphabet) for _ in range(length)) for _ in range(count)]
+
+
+def all_words(length, alphabet):
+    return [''.join(letters) for letters in itertools.product(alphabet, repeat=length)]
+
+
+def test_reference_score_examples():
+    assert reference_score('speed', 'abide') == 'ggygy'
+    assert reference_score('eerie', 'there') == 'ygygG'
+    assert reference_score('aabbb', 'bbaaa') == 'yyyyg'
+
+
+@pytest.mark.parametrize('alphabet', ALPHABETS)
+@pytest.mark.parametrize('length', [1, 2, 5, 8])
+def test_score_matches_reference(alphabet, length):
+    rng = random.Random(length * 31 + len(alphabet))
+    for _ in range(500):
+        guess, answer = random_words(rng, 2, length, alphabet)
+        assert feedback.score(guess, answer) == reference_score(guess, answer)
+
+
+@pytest.mark.parametrize('alphabet', ['ab', 'abc'])
+def test_get_patterns_matches_reference_for_every_pair(alphabet):
+    words = all_words(4, alphabet)
+    patterns = feedback.get_patterns(words, words)
+    expected = [[feedback.pattern_to_int(reference_score(guess, answer)) for answer in words] for guess in words]
+    assert patterns.dtype == feedback.get_pattern_dtype(4)
+    assert np.array_equal(patterns, expected)
+
+
+@pytest.mark.parametrize('length', [5, 6])
+def test_get_patterns_across_chunks(monkeypatch, length):
+    # A chunk size that does not divide the guesses makes the last chunk a short one
+    monkeypatch.setattr(feedback, 'CHUNK_PAIRS', 7 * 50)
+    rng = random.Random(length)
+    guesses = random_words(rng, 45, length, 'abcd')
+    answers = random_words(rng, 50, length, 'abcd')
+    patterns = feedback.get_patterns(guesses, answers)
+    expected = [[feedback.pattern_to_int(reference_score(guess, answer)) for answer in answers] for guess in guesses]
+    assert np.array_equal(patterns, expected)
+
+
+def test_get_patterns_from_encoded_words():
+    rng = random.Random(2)
+    guesses = random_words(rng, 20, 5, 'abc')
+    answers = random_words(rng, 30, 5, 'abc')
+    assert np.array_equal(feedback.get_patterns(feedback.encode_words(guesses), feedback.encode_words(answers)),
+                          feedback.get_patterns(guesses, answers))
+
+
+def test_get_answer_patterns_matches_reference():
+    rng = random.Random(3)
+    answers = random_words(rng, 200, 5, 'abc')
+    for guess in random_words(rng, 20, 5, 'abc'):
+        expected = [feedback.pattern_to_int(reference_score(guess, answer)) for answer in answers]
+        assert np.array_equal(feedback.get_answer_patterns(guess, answers), expected)
+        assert np.array_equal(feedback.get_answer_patterns(guess, feedback.encode_words(answers)), expected)
+
+
+@pytest.mark.parametrize('chunk_rows', [1, 7, 2 ** 16])
+def test_get_matching_rows_matches_reference(chunk_rows):
+    rng = random.Random(chunk_rows)
+    answers = random_words(rng, 150, 5, 'abc')
+    matrix = feedback.encode_words(answers)
+    for guess in random_words(rng, 10, 5, 'abc'):
+        pattern = reference_score(guess, rng.choice(answers))
+        expected = [row for row, answer in enumerate(answers) if reference_score(guess, answer) == pattern]
+        assert feedback.get_matching_rows(matrix, guess, pattern, chunk_rows=chunk_rows).tolist() == expected
+
+
+def test_get_matching_rows_within_rows():
+    rng = random.Random(5)
+    answers = random_words(rng, 150, 5, 'abc')
+    matrix = feedback.encode_words(answers)
+    rows = np.array(sorted(rng.sample(range(len(answers)), 60)))
+    for guess in random_words(rng, 10, 5, 'abc'):
+        pattern = reference_score(guess, answers[rows[0]])
+        expected = [row for row in rows if reference_score(guess, answers[row]) == pattern]
+        assert feedback.get_matching_rows(matrix, guess, pattern, rows=rows, chunk_rows=16).tolist() == expected
+
+
+def test_pattern_round_trip():
+    for length in range(1, 6):
+        for value in range(3 ** length):
+            assert feedback.pattern_to_int(feedback.int_to_pattern(value, length)) == value
+
+
+def get_dense_entropies(patterns, length, weights=None):
+    return feedback.get_entropies_from_counts(feedback.get_pattern_counts(patterns, length, weights=weights))
+
+
+@pytest.mark.parametrize('alphabet', ALPHABETS)
+def test_sparse_entropies_match_dense(alphabet):
+    rng = random.Random(len(alphabet))
+    guesses = random_words(rng, 40, 5, alphabet)
+    answers = random_words(rng, 100, 5, alphabet)
+    patterns = feedback.get_patterns(guesses, answers)
+    assert np.allclose(feedback.get_sparse_entropies(patterns), get_dense_entropies(patterns, 5))
+
+
+@pytest.mark.parametrize('alphabet', ALPHABETS)
+def test_weighted_sparse_entropies_match_dense(alphabet):
+    rng = random.Random(len(alphabet) + 10)
+    guesses = random_words(rng, 40, 5, alphabet)
+    answers = random_words(rng, 100, 5, alphabet)
+    weights = np.array([rng.choice([0, 0.5, 1, 3]) for _ in answers])
+    patterns = feedback.get_patterns(guesses, answers)
+    assert np.allclose(feedback.get_sparse_entropies(patterns, weights=weights),
+                       get_dense_entropies(patterns, 5, weights=weights))
+
+
+def test_equal_weights_match_unweighted_entropies():
+    rng = random.Random(12)
+    words = random_words(rng, 80, 5, 'abcd')
+    patterns = feedback.get_patterns(words, words)
+    assert np.allclose(feedback.get_sparse_entropies(patterns, weights=np.full(len(words), 2.0)),
+                       feedback.get_sparse_entropies(patterns))
+
+
+@pytest.mark.parametrize('length', [2, 5])
+def test_guess_entropies_match_dense(length):
+    # Two letter words have fewer possible patterns than answers, so the dense path is taken instead of the sparse one
+    rng = random.Random(length + 20)
+    guesses = random_words(rng, 30, length, 'abc')
+    answers = random_words(rng, 60, length, 'abc')
+    expected = get_dense_entropies(feedback.get_patterns(guesses, answers), length)
+    assert np.allclose(feedback.get_guess_entropies(guesses, answers, length), expected)
+    assert np.allclose(feedback.get_guess_entropies(None, answers, length,
+                                                    patterns=feedback.get_patterns(guesses, answers)), expected)
+
+
+def test_entropy_bounds_hold():
+    rng = random.Random(30)
+    guesses = random_words(rng, 50, 5, 'abcd')
+    answers = random_words(rng, 120, 5, 'abcd')
+    weights = np.array([rng.random() for _ in answers])
+    for answer_weights in (None, weights):
+        bounds = feedback.get_entropy_bounds(feedback.encode_words(guesses), feedback.encode_words(answers),
+                                             answer_weights)
+        entropies = feedback.get_guess_entropies(guesses, answers, 5, weights=answer_weights)
+        assert (bounds >= entropies - 1e-9).all()
@@ -0,0 +1,105 @@
+import random
+
+import numpy as np
+import pytest
+
+import feedback
+import session
+import wordle
+import word_store
+from tests.test_feedback import all_words, random_words, reference_score
+
+
+def filter_by_pattern(words, turns):
+    # The answers that would have given every pattern seen so far
+    return [word for word in words if all(reference_score(guess, word) == pattern for guess, pattern in turns)]
+
+
+def play_turns(rng, words, count):
+    # A few guesses against a hidden answer, with the pattern each one got
+    answer = rng.choice(words)
+    return [(guess, reference_score(guess, answer)) for guess in random_words(rng, count, len(answer), 'abc')]
+
+
+@pytest.mark.parametrize('seed', range(5))
+def test_get_possible_words_matches_pattern_filter(seed):
+    # The letter rules should keep exactly the words that give the same pattern, turn after turn
+    rng = random.Random(seed)
+    words = sorted(set(random_words(rng, 300, 5, 'abc')))
+    possible = words
+    yellow_dict = {letter: 0 for letter in wordle.ALPHABET}
+    turns = list()
+    for guess, pattern in play_turns(rng, words, 3):
+        turns.append((guess, pattern))
+        possible, yellow_dict = wordle.get_possible_words(possible, guess, pattern, yellow_dict)
+        assert sorted(possible) == filter_by_pattern(words, turns)
+
+
+def test_get_possible_words_from_store():
+    rng = random.Random(10)
+    words = sorted(set(random_words(rng, 300, 5, 'abc')))
+    store = word_store.WordStore(words, wordle.ALPHABET)
+    yellow_dict = {letter: 0 for letter in wordle.ALPHABET}
+    for guess, pattern in play_turns(rng, words, 5):
+        possible, _ = wordle.get_possible_words(store, guess, pattern, dict(yellow_dict))
+        assert sorted(possible.decode()) == filter_by_pattern(words, [(guess, pattern)])
+
+
+@pytest.mark.parametrize('with_patterns', [False, True])
+def test_session_matches_pattern_filter(with_patterns):
+    rng = random.Random(20)
+    words = sorted(set(random_words(rng, 300, 5, 'abc')))
+    patterns = feedback.get_patterns(words, words) if with_patterns else None
+    game = session.Session(words, patterns=patterns)
+    turns = play_turns(rng, words, 4)
+    for count in range(1, len(turns) + 1):
+        game.apply(*turns[count - 1])
+        assert game.get_possible_words() == filter_by_pattern(words, turns[:count])
+
+    game.undo()
+    assert game.get_possible_words() == filter_by_pattern(words, turns[:-1])
+    game.set_guesses(turns[:1])
+    assert game.get_possible_words() == filter_by_pattern(words, turns[:1])
+
+
+def test_session_entropies_match_fresh_scoring(monkeypatch):
+    # Entropies kept up to date between guesses should match scoring the remaining candidates from scratch
+    # With every two letter word there are far more candidates than patterns, and a guess of a letter the answer does
+    # not have rules out few enough of them that the histograms are updated in place
+    words = all_words(2, wordle.ALPHABET)
+    patterns = feedback.get_patterns(words, words)
+    rows = np.arange(len(words))
+    game = session.Session(words, patterns=patterns)
+    updates = list()
+    update = session.EntropyTracker.update
+    monkeypatch.setattr(session.EntropyTracker, 'update',
+                        lambda tracker, answers, sign: updates.append(sign) or update(tracker, answers, sign))
+
+    def check():
+        expected = feedback.get_guess_entropies(None, game.candidates, 2,
+                                                patterns=patterns[np.ix_(rows, game.candidates)])
+        assert np.allclose(game.get_entropies(rows), expected)
+
+    check()
+    tracker = game.tracker
+    game.apply('aa', 'gg')
+    check()
+    game.apply('bb', 'gg')
+    check()
+    assert updates == [-1, -1] and game.tracker is tracker
+
+    game.undo()
+    check()
+    game.set_guesses([('aa', 'gg'), ('cc', 'gg')])
+    check()
+    assert updates == [-1, -1, 1, -1] and game.tracker is tracker
+
+    # A guess that rules out most candidates puts the histograms aside, and taking it back brings them back
+    game.apply('da', 'Gg')
+    check()
+    game.undo()
+    assert game.tracker is tracker
+    check()
+    game.set_guesses([])
+    check()
+    assert updates == [-1, -1, 1, -1, 1, 1] and game.tracker is tracker
@@ -0,0 +1,22 @@
+import os
+import stat
+
+import numpy as np
+import pytest
+
+import pattern_cache
+
+
+@pytest.mark.skipif(os.name != 'posix', reason='file modes are only kept on POSIX')
+def test_saved_files_get_the_usual_permissions(tmp_path):
+    # Cached files may be shared with other users, so they should not be left readable by their owner alone
+    path = str(tmp_path / 'array.npy')
+    umask = os.umask(0o022)
+    try:
+        pattern_cache.save_array(path, np.arange(5))
+        pattern_cache.build_pattern_matrix(['ab', 'ba'], ['ab', 'bb'], str(tmp_path / 'matrix.npy'))
+    finally:
+        os.umask(umask)
+    assert stat.S_IMODE(os.stat(path).st_mode) == 0o644
+    assert stat.S_IMODE(os.stat(tmp_path / 'matrix.npy').st_mode) == 0o644
+    assert sorted(os.listdir(tmp_path)) == ['array.npy', 'matrix.npy']
@@ -0,0 +1,22 @@
+import random
+
+import numpy as np
+import pytest
+
+import feedback
+import search
+from tests.test_feedback import random_words
+
+
+@pytest.mark.parametrize('objective', ['expected', 'worst'])
+def test_bounded_table_ranks_like_unbounded(objective):
+    # Forgetting positions only means solving them again, so the ranking is the same
+    rng = random.Random(40)
+    words = sorted(set(random_words(rng, 120, 4, 'abcd')))
+    patterns = feedback.get_patterns(words, words)
+    candidates = np.arange(len(words))
+    unbounded = search.Search(patterns, words, candidates, 4, objective=objective, beam_width=4, max_depth=3)
+    bounded = search.Search(patterns, words, candidates, 4, objective=objective, beam_width=4, max_depth=3,
+                            table_size=5)
+    assert bounded.rank_guesses(candidates) == unbounded.rank_guesses(candidates)
+    assert len(unbounded.table) > 5 and len(bounded.table) <= 5
@@ -0,0 +1,58 @@
+import pytest
+
+import server
+
+
+def wordle_request(**fields):
+    return dict({'game': 'wordle', 'guesses': ['crane'], 'patterns': ['gyggG']}, **fields)
+
+
+def test_parse_request():
+    request = server.parse_request(wordle_request(top_k=10, open_guesses=True, objective='worst'))
+    assert request == {
+        'game': 'wordle',
+        'solution': None,
+        'history': [('crane', 'gyggG')],
+        'top_k': 10,
+        'open_guesses': True,
+        'objective': 'worst',
+    }
+    assert server.parse_request({'game': 'mathler', 'solution': 42})['solution'] == 42
+
+
+@pytest.mark.parametrize('open_guesses', ['false', 'true', 0, 1, None])
+def test_open_guesses_must_be_a_flag(open_guesses):
+    # The string "false" is truthy, so it would otherwise open the guesses up
+    with pytest.raises(ValueError, match='open_guesses'):
+        server.parse_request(wordle_request(open_guesses=open_guesses))
+
+
+@pytest.mark.parametrize('top_k', [True, False, 0, server.MAX_TOP_K + 1, 2.5, '10'])
+def test_top_k_must_be_a_number_in_range(top_k):
+    # JSON true is a Python int equal to 1, so it would otherwise pass as a top_k of one
+    with pytest.raises(ValueError, match='top_k'):
+        server.parse_request(wordle_request(top_k=top_k))
+
+
+@pytest.mark.parametrize('solution', [True, False, None, 42.0, '42'])
+def test_mathler_solution_must_be_an_integer(solution):
+    with pytest.raises(ValueError, match='solution'):
+        server.parse_request({'game': 'mathler', 'solution': solution})
+
+
+@pytest.mark.parametrize('fields', [
+    {'guesses': ['crane'], 'patterns': []},
+    {'guesses': ['cran'], 'patterns': ['gyggG']},
+    {'guesses': ['crane'], 'patterns': ['gyggx']},
+    {'guesses': [5], 'patterns': ['gyggG']},
+    {'objective': 'best'},
+])
+def test_bad_history_or_objective(fields):
+    with pytest.raises(ValueError):
+        server.parse_request(wordle_request(**fields))
+
+
+@pytest.mark.parametrize('value', [[], 'wordle', {'game': 'chess'}])
+def test_bad_request(value):
+    with pytest.raises(ValueError):
+        server.parse_request(value)
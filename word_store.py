@@ -0,0 +1,107 @@
+import copy
+
+import numpy as np
+
+import feedback
+
+# The characters each game's words are made of
+LETTERS = 'abcdefghijklmnopqrstuvwxyz'
+EQUATION_CHARACTERS = '0123456789+-*/='
+
+
+class WordStore:
+    # A game's vocabulary held once as a read-only uint8 matrix, each character stored as its index in the alphabet
+    # A subset of the vocabulary is just an array of rows into the same matrix, so filtering never copies any words
+    # and any number of subsets (or sessions) can share one store
+    # Each word can also have a prior weight, which is carried along into every subset
+    def __init__(self, words, alphabet, weights=None):
+        self.alphabet = alphabet
+        self.characters = np.frombuffer(alphabet.encode('ascii'), dtype=np.uint8)
+
+        # Characters outside the alphabet all map to one extra code that no word contains
+        self.codes = np.full(256, len(alphabet), dtype=np.uint8)
+        self.codes[self.characters] = np.arange(len(alphabet), dtype=np.uint8)
+
+        self.matrix = self.encode(words)
+        self.matrix.flags.writeable = False
+        self.rows = np.arange(len(self.matrix))
+
+        # How many of each character every word has, with an always empty column for the extra code
+        size = len(alphabet) + 1
+        offsets = np.arange(len(self.matrix), dtype=np.int64)[:, None] * size
+        counts = np.bincount((self.matrix + offsets).ravel(), minlength=len(self.matrix) * size)
+        self.letter_counts = counts.reshape(len(self.matrix), size).astype(np.uint8)
+        self.letter_counts.flags.writeable = False
+
+        self.weights = None
+        if weights is not None:
+            self.weights = np.asarray(weights, dtype=np.float32)
+            if len(self.weights) != len(self.matrix):
+                raise ValueError('There must be one weight for every word')
+            self.weights.flags.writeable = False
+
+    def __len__(self):
+        return len(self.rows)
+
+    def __iter__(self):
+        return iter(self.decode())
+
+    def __getitem__(self, index):
+        return self.get_word(index)
+
+    def encode(self, words):
+        matrix = self.codes[feedback.encode_words(words)]
+        if (matrix == len(self.alphabet)).any():
+            raise ValueError('Words can only contain the characters ' + self.alphabet)
+        return matrix
+
+    def decode(self):
+        return feedback.decode_words(self.characters[self.get_matrix()])
+
+    def get_word(self, index):
+        return self.characters[self.matrix[self.rows[index]]].tobytes().decode('ascii')
+
+    def get_matrix(self):
+        return self.matrix[self.rows]
+
+    def get_weights(self):
+        return self.weights[self.rows] if self.weights is not None else None
+
+    def subset(self, rows):
+        # Rows (or a mask) are relative to this subset, and the new subset shares the same matrix
+        store = copy.copy(self)
+        store.rows = self.rows[rows]
+        return store
+
+    def get_position_mask(self, guess, pattern):
+        # Words with the green letters in the same positions, and none of the other guessed letters where they were
+        mask = np.ones(len(self.rows), dtype=bool)
+        if not len(self.rows):
+            return mask
+        for position, (code, key) in enumerate(zip(self.codes[feedback.encode_words([guess])[0]], pattern)):
+            if key == 'G':
+                mask &= self.matrix[self.rows, position] == code
+            else:
+                mask &= self.matrix[self.rows, position] != code
+        return mask
+
+    def get_count_mask(self, letter_counts, exact=False):
+        # Words with at least (or exactly) the given number of each letter
+        mask = np.ones(len(self.rows), dtype=bool)
+        for letter, count in letter_counts.items():
+            if count == 0 and not exact:
+                continue
+            letter_count = self.letter_counts[self.rows, self.codes[ord(letter)]]
+            mask &= (letter_count == count) if exact else (letter_count >= count)
+        return mask
+
+
+def get_word_stores(words, guesses, alphabet):
+    # The answers and guesses as stores, so they are scored in the same encoding
+    if not isinstance(words, WordStore):
+        words = WordStore(words, alphabet)
+    if guesses is None:
+        return words, words
+    if not isinstance(guesses, WordStore):
+        guesses = WordStore(guesses, words.alphabet)
+    return words, guesses